@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Measures the startup time and peak memory of a process loading the test
+project, with and without WAGTAILMODELTRANSLATION_PATCH_ADMIN.
+
+Each measurement runs in a fresh interpreter:
+
+    python benchmarks/startup.py --runs 5
+"""
+
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(patch_admin):
+    """
+    Sets up Django and loads the Wagtail hooks in this process, returning the
+    seconds it took and the peak resident memory in KiB.
+    """
+    sys.path.insert(0, ROOT)
+    os.environ["DJANGO_SETTINGS_MODULE"] = "wagtail_modeltranslation.tests.settings"
+
+    start = time.perf_counter()
+    import django
+    from django.conf import settings
+
+    settings.WAGTAILMODELTRANSLATION_PATCH_ADMIN = patch_admin
+    django.setup()
+
+    # Serving the first request loads the wagtail_hooks module of every app
+    from wagtail import hooks
+
+    hooks.search_for_hooks()
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in bytes on macOS and in KiB elsewhere
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024
+    return elapsed, rss
+
+
+def run(patch_admin, runs):
+    timings, rss = [], []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--child", "admin" if patch_admin else "runtime"]
+        )
+        elapsed, maxrss = output.split()
+        timings.append(float(elapsed))
+        rss.append(int(maxrss))
+    return statistics.median(timings), statistics.median(rss)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode.")
+    parser.add_argument("--child", choices=["admin", "runtime"], help="Internal.")
+    options = parser.parse_args()
+
+    if options.child:
+        elapsed, rss = measure(options.child == "admin")
+        print(elapsed, rss)
+        return
+
+    print("%-10s %12s %12s" % ("mode", "setup (ms)", "max RSS (KiB)"))
+    for label, patch_admin in (("admin", True), ("runtime", False)):
+        elapsed, rss = run(patch_admin, options.runs)
+        print("%-10s %12.1f %12d" % (label, elapsed * 1000, rss))
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,10 @@ class WagtailModeltranslationConfig(AppConfig):
 
         patch_wagtail_models()
 
+        from wagtail_modeltranslation.rich_text import patch_link_rewriter
+
+        patch_link_rewriter()
+
         from wagtail_modeltranslation.signal_handlers import register_signal_handlers
 
         register_signal_handlers()
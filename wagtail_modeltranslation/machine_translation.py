@@ -0,0 +1,53 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from wagtail_modeltranslation.settings import (
+    TRANSLATION_PROVIDER,
+    TRANSLATION_PROVIDER_OPTIONS,
+)
+
+
+class BaseTranslationProvider(object):
+    """
+    Machine translation service used by the ``machine_translate`` command.
+
+    Subclasses implement ``translate``, which is called with batches of texts
+    and may be called from several threads at once. The options of
+    ``WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER_OPTIONS`` are passed to the
+    constructor as keyword arguments.
+    """
+
+    def __init__(self, **options):
+        self.options = options
+
+    def translate(self, texts, source_language, target_language, html=False):
+        """
+        Returns the translations of ``texts``, a list of strings, from
+        ``source_language`` into ``target_language`` in the same order. With
+        ``html`` the texts are HTML fragments, such as rich text.
+        """
+        raise NotImplementedError
+
+
+class DummyTranslationProvider(BaseTranslationProvider):
+    """
+    Local provider prefixing each text with its target language, for tests and
+    trial runs.
+    """
+
+    def translate(self, texts, source_language, target_language, html=False):
+        return ["[%s] %s" % (target_language, text) for text in texts]
+
+
+def get_translation_provider(path=None):
+    """
+    Returns an instance of the provider class at ``path``, by default the one
+    set in WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER.
+    """
+    path = path or TRANSLATION_PROVIDER
+    if not path:
+        raise ImproperlyConfigured(
+            "No machine translation provider is set, set "
+            "WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER."
+        )
+    return import_string(path)(**TRANSLATION_PROVIDER_OPTIONS)
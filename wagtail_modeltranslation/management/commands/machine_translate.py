@@ -0,0 +1,259 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Case, CharField, SlugField, TextField, Value, When
+from modeltranslation.management.commands.update_translation_fields import (
+    COMMASPACE,
+)
+from modeltranslation.settings import AVAILABLE_LANGUAGES, DEFAULT_LANGUAGE
+from modeltranslation.utils import build_localized_fieldname
+from wagtail.fields import RichTextField
+from wagtail.models import Page, Revision
+
+from wagtail_modeltranslation.machine_translation import get_translation_provider
+from wagtail_modeltranslation.rich_text import invalidate_page_url_cache
+from wagtail_modeltranslation.utils import empty_value_q
+
+from .update_translation_fields import Command as UpdateTranslationFieldsCommand
+
+
+def is_machine_translatable(field):
+    """
+    Returns whether the values of ``field`` are free text a machine
+    translation can be written to.
+    """
+    return (
+        field.editable
+        and not field.choices
+        and isinstance(field, (CharField, TextField))
+        and not isinstance(field, SlugField)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the empty translation fields of text fields in with a machine "
+        "translation of their source language value."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "app_label",
+            nargs="?",
+            help="App label of an application to translate.",
+        )
+        parser.add_argument(
+            "model_name",
+            nargs="?",
+            help="Model name to translate, requires app_label.",
+        )
+        parser.add_argument(
+            "--source-language",
+            default=DEFAULT_LANGUAGE,
+            help="Language translated from. Defaults to the default language.",
+        )
+        parser.add_argument(
+            "--language",
+            dest="languages",
+            nargs="+",
+            metavar="LANGUAGE",
+            help="Languages translated into. Defaults to every other language.",
+        )
+        parser.add_argument(
+            "--fields",
+            nargs="+",
+            metavar="FIELD",
+            help="Names of the translated fields to fill in. Defaults to all of them.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=50,
+            help="Number of texts sent to the provider at once. Defaults to 50.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of batches sent to the provider concurrently. Defaults to 4.",
+        )
+        parser.add_argument(
+            "--provider",
+            help=(
+                "Dotted path of the provider class, defaults to "
+                "WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Translate without writing the translations.",
+        )
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.batch_size = options["batch_size"]
+        self.workers = options["workers"]
+        self.dry_run = options["dry_run"]
+
+        try:
+            self.provider = get_translation_provider(options["provider"])
+        except (ImportError, ImproperlyConfigured) as e:
+            raise CommandError(e)
+
+        source_language = options["source_language"]
+        languages = options["languages"] or [
+            language for language in AVAILABLE_LANGUAGES if language != source_language
+        ]
+        for language in [source_language] + languages:
+            if language not in AVAILABLE_LANGUAGES:
+                raise CommandError(
+                    "Cannot find language '%s'. Options are %s."
+                    % (language, COMMASPACE.join(AVAILABLE_LANGUAGES))
+                )
+
+        fields_command = UpdateTranslationFieldsCommand()
+        jobs = []
+        models = fields_command.get_models(options)
+        for model, field_names, rows_model in fields_command.get_table_fields(models):
+            # Inherited fields are translated through the selected models
+            model = rows_model or model
+            for field_name in field_names:
+                if options["fields"] and field_name not in options["fields"]:
+                    continue
+                field = model._meta.get_field(field_name)
+                if is_machine_translatable(field):
+                    jobs.extend(
+                        (model, field, language)
+                        for language in languages
+                        if language != source_language
+                    )
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for model, field, language in jobs:
+                translated, skipped = self.translate_field(
+                    executor, model, field, source_language, language
+                )
+                if self.verbosity > 0 and (translated or skipped):
+                    self.stdout.write(
+                        "Translated %s values of field '%s' of model '%s' into %s%s"
+                        % (
+                            translated,
+                            field.name,
+                            model._meta.label,
+                            language,
+                            ", skipped %s too long" % skipped if skipped else "",
+                        )
+                    )
+
+        if not self.dry_run and any(issubclass(model, Page) for model, _, _ in jobs):
+            invalidate_page_url_cache()
+
+    def get_batches(self, queryset, source_field_name):
+        """
+        Yields the ``(pk, source value)`` pairs of ``queryset`` in batches,
+        paginating on the primary key.
+        """
+        queryset = queryset.order_by("pk").values_list("pk", source_field_name)
+        last_pk = None
+        while True:
+            if last_pk is None:
+                batch = list(queryset[: self.batch_size])
+            else:
+                batch = list(queryset.filter(pk__gt=last_pk)[: self.batch_size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][0]
+
+    def translate_field(self, executor, model, field, source_language, language):
+        """
+        Translates the empty ``language`` values of ``field`` whose source value
+        isn't empty, keeping up to ``workers`` batches at the provider while
+        the translated ones are written. Returns the number of values
+        translated and the number of values skipped for being too long.
+        """
+        source_field_name = build_localized_fieldname(field.name, source_language)
+        field_name = build_localized_fieldname(field.name, language)
+        queryset = (
+            model._default_manager.rewrite(False)
+            .filter(empty_value_q(field, field_name))
+            .exclude(empty_value_q(field, source_field_name))
+        )
+
+        html = isinstance(field, RichTextField)
+        translated = skipped = 0
+        pending = deque()
+        for batch in self.get_batches(queryset, source_field_name):
+            pks = [pk for pk, text in batch]
+            texts = [text for pk, text in batch]
+            future = executor.submit(
+                self.provider.translate, texts, source_language, language, html=html
+            )
+            pending.append((pks, future))
+            if len(pending) >= self.workers:
+                counts = self.write(model, field, field_name, *pending.popleft())
+                translated, skipped = translated + counts[0], skipped + counts[1]
+
+        while pending:
+            counts = self.write(model, field, field_name, *pending.popleft())
+            translated, skipped = translated + counts[0], skipped + counts[1]
+        return translated, skipped
+
+    def write(self, model, field, field_name, pks, future):
+        """
+        Writes the translations of a batch to the rows still empty, in a single
+        update. Returns the number of values written and skipped.
+        """
+        texts = future.result()
+        if len(texts) != len(pks):
+            raise CommandError(
+                "The provider returned %s translations for %s texts."
+                % (len(texts), len(pks))
+            )
+
+        localized_field = model._meta.get_field(field_name)
+        translations = {
+            pk: text
+            for pk, text in zip(pks, texts)
+            if not localized_field.max_length or len(text) <= localized_field.max_length
+        }
+        skipped = len(pks) - len(translations)
+        if self.dry_run or not translations:
+            return len(translations), skipped
+
+        model._default_manager.rewrite(False).filter(
+            empty_value_q(field, field_name), pk__in=list(translations)
+        ).update(
+            **{
+                field_name: Case(
+                    *[
+                        When(pk=pk, then=Value(text))
+                        for pk, text in translations.items()
+                    ],
+                    output_field=localized_field,
+                )
+            }
+        )
+        if issubclass(model, Page):
+            self.update_revisions(field_name, translations)
+        return len(translations), skipped
+
+    def update_revisions(self, field_name, translations):
+        """
+        Writes the translations to the latest revision of their pages as well,
+        so they aren't lost when a draft is edited or published.
+        """
+        revisions = Revision.objects.filter(
+            id__in=Page.objects.filter(pk__in=list(translations)).values(
+                "latest_revision_id"
+            )
+        )
+        changed = []
+        for revision in revisions:
+            if field_name in revision.content and not revision.content[field_name]:
+                revision.content[field_name] = translations[int(revision.object_id)]
+                changed.append(revision)
+        Revision.objects.bulk_update(changed, ["content"])
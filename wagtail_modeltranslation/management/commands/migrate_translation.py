@@ -1,19 +1,30 @@
+import threading
+
+from django import VERSION as DJANGO_VERSION
+from django.core.management.commands import migrate
 from django.core.management.commands.migrate import Command as MigrateCommand
 from django.db.migrations.autodetector import MigrationAutodetector
 
 from .sync_page_translation_fields import Command as SyncPageTranslationFieldsCommand
 
+# Serializes the runs swapping the autodetector of the migrate module
+_autodetector_lock = threading.Lock()
+
+
+class PageMigrationAutodetector(MigrationAutodetector):
+    """
+    Autodetector silencing any wagtailcore migrations missing warnings, the
+    translation fields of Page are synced rather than migrated.
+    """
 
-# decorate MigrationAutodetector.changes so we can silence any wagtailcore migrations missing warnings
-def changes_decorator(func):
-    def wrapper(self, graph, trim_to_apps=None, convert_apps=None, migration_name=None):
-        changes = func(self, graph, trim_to_apps, convert_apps, migration_name)
+    def changes(self, graph, trim_to_apps=None, convert_apps=None, migration_name=None):
+        changes = super(PageMigrationAutodetector, self).changes(
+            graph, trim_to_apps, convert_apps, migration_name
+        )
         if "wagtailcore" in changes:
             del changes["wagtailcore"]
         return changes
 
-    return wrapper
-
 
 class Command(MigrateCommand):
     help = (
@@ -21,17 +32,39 @@ class Command(MigrateCommand):
         "Updates Wagtail Page translation fields"
     )
 
-    def handle(self, *args, **options):
-        old_autodetector_changes = MigrationAutodetector.changes
-        MigrationAutodetector.changes = changes_decorator(MigrationAutodetector.changes)
+    # Used by Django 5.2+, older versions use the autodetector of the migrate module
+    autodetector = PageMigrationAutodetector
 
-        try:
+    def handle(self, *args, **options):
+        if DJANGO_VERSION >= (5, 2):
             super(Command, self).handle(*args, **options)
-        finally:
-            MigrationAutodetector.changes = old_autodetector_changes
+        else:
+            self.handle_with_autodetector(*args, **options)
 
         # Run sync_page_translation_fields command
         sync_page_command = SyncPageTranslationFieldsCommand()
         # Update the dict of sync_page_command with the content of this one
         sync_page_command.__dict__.update(self.__dict__)
+
+        # Skip the introspection of every translated field when all the Page
+        # translation columns already exist
+        if not sync_page_command.get_missing_page_columns():
+            if options["verbosity"] >= 1:
+                self.stdout.write("No new translatable fields detected")
+            return
+
         sync_page_command.handle(*args, **options)
+
+    def handle_with_autodetector(self, *args, **options):
+        """
+        Migrates with PageMigrationAutodetector swapped into the migrate module,
+        which is where Django before 5.2 looks it up. Only one run swaps it at a
+        time, so concurrent runs can't restore each other's autodetector.
+        """
+        with _autodetector_lock:
+            old_autodetector = migrate.MigrationAutodetector
+            migrate.MigrationAutodetector = PageMigrationAutodetector
+            try:
+                super(Command, self).handle(*args, **options)
+            finally:
+                migrate.MigrationAutodetector = old_autodetector
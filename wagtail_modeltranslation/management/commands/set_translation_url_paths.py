@@ -1,26 +1,434 @@
-from django.core.management.base import BaseCommand
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_all_start_methods, get_context
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
 from modeltranslation import settings as mt_settings
-from modeltranslation.utils import build_localized_fieldname
+from modeltranslation.utils import build_localized_fieldname, resolution_order, unique
 from wagtail.models import Page
+
 from wagtail_modeltranslation.contextlib import use_language
+from wagtail_modeltranslation.rich_text import invalidate_page_url_cache
 
 
 class Command(BaseCommand):
-    def __init__(self):
-        super(Command, self).__init__()
-        update_fields = ["url_path"]
-        for language in mt_settings.AVAILABLE_LANGUAGES:
-            localized_url_path = build_localized_fieldname("url_path", language)
-            update_fields.append(localized_url_path)
-        self.update_fields = update_fields
-
-    def set_subtree(self, root, parent):
-        root.set_url_path(parent)
-        root.save(update_fields=self.update_fields)
-        for child in root.get_children():
-            self.set_subtree(child, root)
+    help = (
+        "Updates url_path translation fields for all pages. The page tree is walked "
+        "level by level and only the changed url paths are written, in bulk."
+    )
+
+    def __init__(self, *args, **kwargs):
+        super(Command, self).__init__(*args, **kwargs)
+        self.languages = list(mt_settings.AVAILABLE_LANGUAGES)
+        self.slug_fields = [
+            build_localized_fieldname("slug", language) for language in self.languages
+        ]
+        self.url_path_fields = [
+            build_localized_fieldname("url_path", language)
+            for language in self.languages
+        ]
+        self.update_fields = ["url_path"] + self.url_path_fields
+
+        # Order in which slugs are looked up for each language, emulating
+        # `_localized_set_url_path`: the language itself, the default language
+        # and then the original field fallbacks for the default language.
+        default_language = mt_settings.DEFAULT_LANGUAGE
+        default_order = resolution_order(
+            default_language, getattr(Page, "slug").fallback_languages
+        )
+        self.slug_lookup_order = [
+            [
+                self.slug_fields[self.languages.index(lang)]
+                for lang in unique((language, default_language) + default_order)
+                if lang in self.languages
+            ]
+            for language in self.languages
+        ]
+        self.default_index = self.languages.index(default_language)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of pages read and written per query. Defaults to 1000.",
+        )
+        parser.add_argument(
+            "--root",
+            type=int,
+            help="Id of a page, only the url paths of its subtree are updated.",
+        )
+        parser.add_argument(
+            "--languages",
+            nargs="+",
+            help="Languages to update the url paths of. Defaults to all languages.",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help=(
+                "File where progress is stored after each tree level. If the file "
+                "exists the update resumes from the level it stores."
+            ),
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of processes updating the subtrees below the top level in "
+                "parallel, each with its own database connection. Defaults to 1."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many url paths would change without writing them.",
+        )
+
+    def compute_url_paths(self, row, parent_url_paths):
+        """
+        Returns the url paths of a page, one per language, given its
+        ``slug_<lang>`` values and the new url paths of its parent.
+        """
+        if parent_url_paths is None:
+            # a page without a parent is the tree root,
+            # which always has a url_path of '/'
+            return tuple("/" for language in self.languages)
+
+        url_paths = []
+        for index, lookup_order in enumerate(self.slug_lookup_order):
+            slug = next((row[field] for field in lookup_order if row[field]), "")
+            url_paths.append(parent_url_paths[index] + slug + "/")
+        return tuple(url_paths)
+
+    def stored_url_paths(self, row):
+        """
+        Returns the url paths stored for a page, with the same fallbacks
+        `_localized_set_url_path` applies to the parent page.
+        """
+        default_url_path = row[self.url_path_fields[self.default_index]]
+        return tuple(
+            row[field] or default_url_path or row["url_path"]
+            for field in self.url_path_fields
+        )
+
+    def get_level_queryset(self, depth):
+        pages = Page.objects.rewrite(False).filter(depth=depth)
+        if self.root:
+            pages = pages.filter(path__startswith=self.root.path)
+        return pages.order_by("path")
+
+    def load_level(self, depth):
+        """
+        Returns the url paths currently stored for the pages at ``depth``,
+        mapped by path.
+        """
+        pages = self.get_level_queryset(depth).values("path", *self.update_fields)
+        return {
+            row["path"]: self.stored_url_paths(row)
+            for row in pages.iterator(chunk_size=self.batch_size)
+        }
+
+    def update_pages(self, pages):
+        """
+        Writes the new url paths of the given ``(id, url_paths)`` pairs.
+        """
+        if self.dry_run:
+            return
+        Page.objects.rewrite(False).bulk_update(
+            [
+                Page(
+                    id=page_id,
+                    **{
+                        self.url_path_fields[index]: url_paths[index]
+                        for index in self.write_indexes
+                    }
+                )
+                for page_id, url_paths in pages
+            ],
+            self.write_fields,
+        )
+
+    def update_level(self, depth, parents):
+        """
+        Updates every page at ``depth`` whose parent is found in ``parents``, a
+        dict mapping paths to new url paths. Returns the same mapping for the
+        pages of this level and the number of pages changed.
+        """
+        pages = self.get_level_queryset(depth).values(
+            "id", "path", *self.update_fields, *self.slug_fields
+        )
+        level = {}
+        changed = []
+        changed_count = 0
+        for row in pages.iterator(chunk_size=self.batch_size):
+            if depth > 1:
+                parent_path = row["path"][: -Page.steplen]
+                if parent_path not in parents:
+                    # Not reachable from the root nodes, leave it untouched
+                    continue
+                parent_url_paths = parents[parent_path]
+            else:
+                parent_url_paths = None
+
+            url_paths = self.compute_url_paths(row, parent_url_paths)
+            level[row["path"]] = url_paths
+
+            page_changed = False
+            for index in self.write_indexes:
+                if row[self.url_path_fields[index]] != url_paths[index]:
+                    self.changed_paths[self.url_path_fields[index]] += 1
+                    page_changed = True
+            if (
+                "url_path" in self.write_fields
+                and row["url_path"] != url_paths[self.default_index]
+            ):
+                self.changed_paths["url_path"] += 1
+                page_changed = True
+
+            if page_changed:
+                changed.append((row["id"], url_paths))
+
+            if len(changed) >= self.batch_size:
+                self.update_pages(changed)
+                changed_count += len(changed)
+                changed = []
+
+        if changed:
+            self.update_pages(changed)
+            changed_count += len(changed)
+
+        return level, changed_count
+
+    def get_checkpoint_scope(self):
+        return {
+            "root": self.root.id if self.root else None,
+            "languages": [self.languages[index] for index in self.write_indexes],
+        }
+
+    def read_checkpoint(self, checkpoint):
+        if not checkpoint or not os.path.exists(checkpoint):
+            return None
+
+        with open(checkpoint) as checkpoint_file:
+            state = json.load(checkpoint_file)
+
+        depth = state.pop("depth")
+        if state != self.get_checkpoint_scope():
+            raise CommandError(
+                "Checkpoint '%s' was created with different --root or --languages "
+                "options." % checkpoint
+            )
+        return depth
+
+    def write_checkpoint(self, checkpoint, depth):
+        if not checkpoint:
+            return
+
+        with open(checkpoint, "w") as checkpoint_file:
+            json.dump(dict(self.get_checkpoint_scope(), depth=depth), checkpoint_file)
+
+    def setup(self, options):
+        self.batch_size = options["batch_size"]
+        self.dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+
+        languages = options["languages"] or self.languages
+        for language in languages:
+            if language not in self.languages:
+                raise CommandError(
+                    "Cannot find language '%s'. Options are %s."
+                    % (language, ", ".join(self.languages))
+                )
+        self.write_indexes = [
+            index
+            for index, language in enumerate(self.languages)
+            if language in languages
+        ]
+        self.write_fields = [self.url_path_fields[i] for i in self.write_indexes]
+        if self.default_index in self.write_indexes:
+            # The original field mirrors the default language one
+            self.write_fields.insert(0, "url_path")
+        self.changed_paths = dict.fromkeys(["url_path"] + self.url_path_fields, 0)
+
+        self.root = None
+        if options["root"]:
+            try:
+                self.root = Page.objects.get(id=options["root"])
+            except Page.DoesNotExist:
+                raise CommandError("Page %s does not exist." % options["root"])
+
+    def get_top_level(self):
+        """
+        Returns the depth the update starts at, along with the parent url
+        paths needed to update it.
+        """
+        if not self.root or self.root.depth == 1:
+            return 1, {}
+
+        parent_path = self.root.path[: -Page.steplen]
+        parent = (
+            Page.objects.rewrite(False)
+            .filter(path=parent_path)
+            .values(*self.update_fields)
+            .get()
+        )
+        return self.root.depth, {parent_path: self.stored_url_paths(parent)}
+
+    def update_tree(self, depth, parents, checkpoint=None):
+        """
+        Updates the pages level by level, starting at ``depth``. Returns the
+        number of pages changed.
+        """
+        total_changed = 0
+        while True:
+            self.write_checkpoint(checkpoint, depth)
+            parents, changed_count = self.update_level(depth, parents)
+            total_changed += changed_count
+            if not parents:
+                return total_changed
+            if self.verbosity >= 2:
+                self.stdout.write(
+                    "Depth {}: {} pages, {} updated".format(
+                        depth, len(parents), changed_count
+                    )
+                )
+            depth += 1
+
+    def update_tree_in_parallel(self, depth, parents, options):
+        """
+        Updates the top levels in this process until there are at least as
+        many subtrees below them as ``--workers``, then hands each subtree to
+        a pool of ``--workers`` processes. Returns the number of pages changed.
+        """
+        total_changed = 0
+        while True:
+            parents, changed_count = self.update_level(depth, parents)
+            total_changed += changed_count
+            if not parents:
+                return total_changed
+            subtrees = [
+                (page_id, path[: -Page.steplen])
+                for page_id, path in self.get_level_queryset(depth + 1).values_list(
+                    "id", "path"
+                )
+                if path[: -Page.steplen] in parents
+            ]
+            if self.verbosity >= 2:
+                self.stdout.write(
+                    "Depth {}: {} pages, {} updated, {} subtrees below".format(
+                        depth, len(parents), changed_count, len(subtrees)
+                    )
+                )
+            if len(subtrees) >= options["workers"]:
+                break
+            depth += 1
+
+        # Workers are forked from this process and must not share its database
+        # connections, they open their own on first use.
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=get_context("fork")
+        )
+        with executor:
+            futures = [
+                executor.submit(
+                    _update_subtree,
+                    dict(options, root=page_id, verbosity=0),
+                    parent_path,
+                    parents[parent_path],
+                )
+                for page_id, parent_path in subtrees
+            ]
+            for future in as_completed(futures):
+                changed_count, changed_paths = future.result()
+                total_changed += changed_count
+                for field, count in changed_paths.items():
+                    self.changed_paths[field] += count
+
+        return total_changed
+
+    def check_consistency(self, options):
+        """
+        Walks the tree again without writing and warns about any url path
+        still out of date, e.g. pages edited while the workers were running.
+        """
+        checker = Command()
+        checker.setup(dict(options, dry_run=True))
+        depth, parents = checker.get_top_level()
+        pending = checker.update_tree(depth, parents)
+        if pending:
+            self.stderr.write(
+                "Consistency check failed: {} pages still have outdated url paths, "
+                "run the command again.".format(pending)
+            )
+        elif self.verbosity >= 2:
+            self.stdout.write("Consistency check passed")
 
     def handle(self, **options):
+        checkpoint = options["checkpoint"]
+        if options["dry_run"] and checkpoint:
+            raise CommandError("--checkpoint can't be used along with --dry-run.")
+        if options["workers"] > 1 and checkpoint:
+            raise CommandError("--checkpoint can't be used along with --workers.")
+        if options["workers"] > 1 and "fork" not in get_all_start_methods():
+            raise CommandError("--workers requires a platform supporting fork.")
+
+        self.setup(options)
+
         with use_language(mt_settings.DEFAULT_LANGUAGE):
-            for node in Page.get_root_nodes():
-                self.set_subtree(node, None)
+            depth, parents = self.get_top_level()
+
+            resume_depth = self.read_checkpoint(checkpoint)
+            if resume_depth is not None and resume_depth > depth:
+                # Upper levels are already up to date in the database
+                depth = resume_depth
+                parents = self.load_level(depth - 1)
+
+            if options["workers"] > 1:
+                total_changed = self.update_tree_in_parallel(depth, parents, options)
+                if not self.dry_run:
+                    self.check_consistency(options)
+            else:
+                total_changed = self.update_tree(depth, parents, checkpoint)
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        if self.dry_run:
+            if self.verbosity >= 1:
+                for field in ["url_path"] + self.url_path_fields:
+                    if field in self.write_fields:
+                        self.stdout.write(
+                            "{}: {} paths would change".format(
+                                field, self.changed_paths[field]
+                            )
+                        )
+                self.stdout.write("{} pages would be updated".format(total_changed))
+            return
+
+        if total_changed:
+            # Site root pages may have changed, along with every page url
+            for language in self.languages:
+                cache.delete("wagtail_site_root_paths_{}".format(language))
+            invalidate_page_url_cache()
+
+        if self.verbosity >= 1:
+            self.stdout.write("{} pages updated".format(total_changed))
+
+
+def _update_subtree(options, parent_path, parent_url_paths):
+    """
+    Updates the subtree of ``options["root"]`` in a worker process, given the
+    new url paths of its parent.
+    """
+    command = Command()
+    command.setup(options)
+    with use_language(mt_settings.DEFAULT_LANGUAGE):
+        changed_count = command.update_tree(
+            command.root.depth, {parent_path: parent_url_paths}
+        )
+    return changed_count, command.changed_paths
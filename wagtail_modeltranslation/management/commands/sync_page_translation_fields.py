@@ -1,9 +1,20 @@
+import time
+
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import F, Max, Min, Q
+from django.db.models.functions import Coalesce
+from modeltranslation import settings as mt_settings
 from modeltranslation.management.commands.sync_translation_fields import (
     Command as SyncTranslationsFieldsCommand,
 )
 from modeltranslation.translator import translator
+from modeltranslation.utils import build_localized_fieldname
 from wagtail.models import Page
 
+from wagtail_modeltranslation.rich_text import invalidate_page_url_cache
+from wagtail_modeltranslation.settings import TRANSLATE_SLUGS
+
 old_get_registered_models = translator.get_registered_models
 
 
@@ -20,11 +31,138 @@ class Command(SyncTranslationsFieldsCommand):
         " columns of removed languages or undeclared fields."
     )
 
+    # Fields whose new language columns are filled in by --backfill
+    backfill_fields = ["title"] + (["slug", "url_path"] if TRANSLATE_SLUGS else [])
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--backfill",
+            nargs="*",
+            metavar="LANGUAGE",
+            help=(
+                "Fill in the empty title, slug and url_path columns of the given "
+                "languages, or of the newly added ones if none is given, with the "
+                "values of the default language, or the untranslated ones where "
+                "those are empty."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of page ids covered by each backfill update. Defaults to 1000.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between backfill updates. Defaults to 0.",
+        )
+
     def handle(self, *args, **options):
+        # migrate_translation calls this with the options of migrate
+        backfill = options.get("backfill")
+        self.batch_size = options.get("batch_size", 1000)
+        self.sleep = options.get("sleep", 0)
+        self.verbosity = options.get("verbosity", 1)
+
         translator.get_registered_models = get_page_model.__get__(translator)
 
         try:
+            if backfill == []:
+                missing_languages = self.get_missing_page_languages()
+
             super(Command, self).handle(*args, **options)
 
+            if backfill == []:
+                # Columns the user chose not to add are still missing
+                backfill = [
+                    language
+                    for language in missing_languages
+                    if language not in self.get_missing_page_languages()
+                ]
+            if backfill:
+                for language in backfill:
+                    if language not in mt_settings.AVAILABLE_LANGUAGES:
+                        raise CommandError("Unknown language: %s" % language)
+                self.backfill(backfill)
+
         finally:
             translator.get_registered_models = old_get_registered_models
+
+    def get_missing_page_columns(self):
+        """
+        Returns a dict mapping the translation columns missing from the Page
+        table to their language, with a single introspection of the table.
+        """
+        with connection.cursor() as cursor:
+            columns = {
+                column.name
+                for column in connection.introspection.get_table_description(
+                    cursor, Page._meta.db_table
+                )
+            }
+        opts = translator.get_options_for_model(Page)
+        return {
+            field.column: field.language
+            for fields in opts.local_fields.values()
+            for field in fields
+            if field.column not in columns
+        }
+
+    def get_missing_page_languages(self):
+        missing_columns = self.get_missing_page_columns()
+        return [
+            language
+            for language in mt_settings.AVAILABLE_LANGUAGES
+            if build_localized_fieldname("title", language) in missing_columns
+        ]
+
+    def backfill(self, languages):
+        """
+        Copies the default language values, or the untranslated ones where
+        those are empty, into the translation columns of ``languages``, one range of ``--batch-size`` page ids per update so
+        the table is never locked as a whole. Only empty columns are written,
+        so an interrupted backfill can simply be run again.
+        """
+        values = {}
+        empty = Q()
+        for language in languages:
+            for field in self.backfill_fields:
+                localized_field = build_localized_fieldname(field, language)
+                default_field = build_localized_fieldname(
+                    field, mt_settings.DEFAULT_LANGUAGE
+                )
+                values[localized_field] = Coalesce(
+                    F(localized_field), F(default_field), F(field)
+                )
+                empty |= Q(**{localized_field + "__isnull": True})
+
+        queryset = Page.objects.rewrite(False)
+        id_range = queryset.aggregate(min_id=Min("id"), max_id=Max("id"))
+        if id_range["min_id"] is None:
+            return
+
+        total_updated = 0
+        start = id_range["min_id"]
+        while start <= id_range["max_id"]:
+            end = start + self.batch_size
+            total_updated += queryset.filter(empty, id__gte=start, id__lt=end).update(
+                **values
+            )
+            if self.verbosity >= 2:
+                self.stdout.write(
+                    "Backfilled pages {} to {}: {} pages updated".format(
+                        start, end - 1, total_updated
+                    )
+                )
+            start = end
+            if self.sleep and start <= id_range["max_id"]:
+                time.sleep(self.sleep)
+
+        invalidate_page_url_cache()
+        if self.verbosity >= 1:
+            self.stdout.write(
+                "Backfilled {} in {} pages".format(", ".join(values), total_updated)
+            )
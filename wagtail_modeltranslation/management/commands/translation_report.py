@@ -0,0 +1,67 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from modeltranslation.management.commands.update_translation_fields import (
+    COMMASPACE,
+)
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+
+from wagtail_modeltranslation.reports import (
+    COMPLETENESS_HEADER,
+    GAPS_HEADER,
+    get_completeness_rows,
+    get_gap_rows,
+    get_report_models,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes, as CSV, how many rows of each translated model miss each "
+        "translated field per language, or with --gaps which rows miss them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "app_label",
+            nargs="?",
+            help="App label of an application to report on.",
+        )
+        parser.add_argument(
+            "model_name",
+            nargs="?",
+            help="Model name to report on, requires app_label.",
+        )
+        parser.add_argument(
+            "--language",
+            dest="languages",
+            nargs="+",
+            metavar="LANGUAGE",
+            help="Languages to report on. Defaults to all of them.",
+        )
+        parser.add_argument(
+            "--gaps",
+            action="store_true",
+            help="List the rows missing translated fields, per language.",
+        )
+
+    def handle(self, *args, **options):
+        languages = options["languages"] or AVAILABLE_LANGUAGES
+        for language in languages:
+            if language not in AVAILABLE_LANGUAGES:
+                raise CommandError(
+                    "Cannot find language '%s'. Options are %s."
+                    % (language, COMMASPACE.join(AVAILABLE_LANGUAGES))
+                )
+
+        report_models = get_report_models(options["app_label"], options["model_name"])
+        if options["gaps"]:
+            header, rows = GAPS_HEADER, get_gap_rows(report_models, languages)
+        else:
+            header, rows = COMPLETENESS_HEADER, get_completeness_rows(
+                report_models, languages
+            )
+
+        writer = csv.writer(self.stdout, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows(rows)
@@ -1,7 +1,250 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_all_start_methods, get_context
+
+from django.apps import apps
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.models import Case, F, ManyToManyField, Max, Min, Q, When
 from modeltranslation.management.commands.update_translation_fields import (
+    COMMASPACE,
     Command as UpdateTranslationFieldsCommand,
 )
+from modeltranslation.settings import AVAILABLE_LANGUAGES, DEFAULT_LANGUAGE
+from modeltranslation.translator import translator
+from modeltranslation.utils import build_localized_fieldname
+from wagtail.models import Page
+
+from wagtail_modeltranslation.rich_text import invalidate_page_url_cache
+from wagtail_modeltranslation.utils import empty_value_q
 
 
 class Command(UpdateTranslationFieldsCommand):
-    pass
+    """
+    Updates the empty translation fields one range of primary keys at a time,
+    so large tables like ``wagtailcore_page`` are never locked as a whole.
+    Each table is only updated once: the fields inherited from ``Page`` are
+    updated along with ``Page`` rather than through every page type, or for
+    the rows of the selected page types when ``Page`` isn't selected.
+    """
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of primary keys covered by each update. Defaults to 1000.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between updates. Defaults to 0.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help=(
+                "Number of processes updating primary key ranges in parallel, each "
+                "with its own database connection. Defaults to 1."
+            ),
+        )
+
+    def get_models(self, options):
+        # get all models excluding proxy- and not managed models
+        models = translator.get_registered_models(abstract=False)
+        models = [m for m in models if not m._meta.proxy and m._meta.managed]
+
+        if options["app_label"]:
+            models = [m for m in models if m._meta.app_label == options["app_label"]]
+
+        if options["model_name"]:
+            model_name = options["model_name"].lower()
+            models = [m for m in models if m._meta.model_name == model_name]
+
+        return models
+
+    def get_table_fields(self, models):
+        """
+        Returns the translated fields of ``models`` grouped by the table storing
+        them, as ``(model, field names, rows model)`` triples. The fields
+        inherited from a concrete parent such as ``Page`` are left to the
+        parent when it is one of ``models``. Otherwise they are returned for
+        the parent, with the model inheriting them as rows model: only the
+        parent rows of its instances are concerned. The rows model is None
+        when every row of the table is.
+        """
+        table_fields = []
+        for model in models:
+            opts = translator.get_options_for_model(model)
+            inherited = {}
+            own = []
+            for field_name in opts.all_fields.keys():
+                parent = model._meta.get_field(field_name).model._meta.concrete_model
+                if parent is model:
+                    own.append(field_name)
+                elif parent not in models:
+                    inherited.setdefault(parent, []).append(field_name)
+            if own:
+                table_fields.append((model, own, None))
+            table_fields.extend(
+                (parent, field_names, model)
+                for parent, field_names in inherited.items()
+            )
+        return table_fields
+
+    def get_ranges(self, model):
+        """
+        Returns the ``(start, end)`` primary key ranges covering ``model``.
+        """
+        pk_range = model._default_manager.aggregate(min_pk=Min("pk"), max_pk=Max("pk"))
+        if pk_range["min_pk"] is None:
+            return []
+        if not isinstance(pk_range["min_pk"], int):
+            # Non integer keys can't be split, the table is updated at once
+            return [(None, None)]
+        return [
+            (start, start + self.batch_size)
+            for start in range(
+                pk_range["min_pk"], pk_range["max_pk"] + 1, self.batch_size
+            )
+        ]
+
+    def handle(self, *args, **options):
+        self.verbosity = options["verbosity"]
+        self.batch_size = options["batch_size"]
+        self.sleep = options["sleep"]
+        workers = options["workers"]
+        if workers > 1 and "fork" not in get_all_start_methods():
+            raise CommandError("--workers requires a platform supporting fork.")
+
+        if self.verbosity > 0:
+            self.stdout.write("Using default language: %s" % DEFAULT_LANGUAGE)
+
+        # optionally defining the translation field language
+        lang = options.get("language") or DEFAULT_LANGUAGE
+        if lang not in AVAILABLE_LANGUAGES:
+            raise CommandError(
+                "Cannot find language '%s'. Options are %s."
+                % (lang, COMMASPACE.join(AVAILABLE_LANGUAGES))
+            )
+        lang = lang.replace("-", "_")
+
+        models = self.get_models(options)
+        if self.verbosity > 0:
+            self.stdout.write(
+                "Working on models: %s"
+                % ", ".join(
+                    [
+                        "{app_label}.{object_name}".format(**m._meta.__dict__)
+                        for m in models
+                    ]
+                )
+            )
+
+        jobs = []
+        for model, field_names, rows_model in self.get_table_fields(models):
+            fields = []
+            for field_name in field_names:
+                if isinstance(model._meta.get_field(field_name), ManyToManyField):
+                    self.update_many_to_many_field(model, field_name, lang)
+                else:
+                    fields.append(field_name)
+            if fields:
+                rows_label = rows_model and rows_model._meta.label
+                jobs.extend(
+                    (model._meta.label, fields, lang, start, end, rows_label)
+                    for start, end in self.get_ranges(rows_model or model)
+                )
+
+        if workers > 1 and len(jobs) > 1:
+            # Workers are forked from this process and must not share its
+            # database connections, they open their own on first use.
+            connections.close_all()
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=get_context("fork")
+            )
+            with executor:
+                futures = [
+                    executor.submit(_update_range, *job, sleep=self.sleep)
+                    for job in jobs
+                ]
+                results = (future.result() for future in as_completed(futures))
+                updated = self.report_progress(results, jobs)
+        else:
+            results = (
+                _update_range(*job, sleep=self.sleep if n else 0)
+                for n, job in enumerate(jobs)
+            )
+            updated = self.report_progress(results, jobs)
+
+        if any(issubclass(apps.get_model(label), Page) for label in updated):
+            invalidate_page_url_cache()
+
+        if self.verbosity > 0:
+            for label, count in updated.items():
+                self.stdout.write("Updated %s rows of model '%s'" % (count, label))
+
+    def report_progress(self, results, jobs):
+        """
+        Consumes the results of the range updates as they complete, writing
+        the progress at verbosity 2. Returns the rows updated per model.
+        """
+        updated = {job[0]: 0 for job in jobs}
+        for done, (label, count) in enumerate(results, 1):
+            updated[label] += count
+            if self.verbosity >= 2:
+                self.stdout.write(
+                    "%s/%s ranges done, %s rows of model '%s' updated"
+                    % (done, len(jobs), updated[label], label)
+                )
+        return updated
+
+    def update_many_to_many_field(self, model, field_name, lang):
+        trans_field = getattr(model, build_localized_fieldname(field_name, lang))
+        if not trans_field.through.objects.exists():
+            field_names = [f.name for f in trans_field.through._meta.fields]
+            trans_field.through.objects.bulk_create(
+                trans_field.through(
+                    **{f: v for f, v in inst.__dict__.items() if f in field_names}
+                )
+                for inst in getattr(model, field_name).through.objects.all()
+            )
+
+
+def _update_range(label, fields, lang, start, end, rows_label=None, sleep=0):
+    """
+    Copies the original values of ``fields`` into their empty ``lang``
+    translation fields, for the rows of the model ``label`` whose primary key
+    is in ``[start, end)``, and is one of the model ``rows_label`` if given.
+    Returns the model label and the rows updated.
+    """
+    if sleep:
+        time.sleep(sleep)
+
+    model = apps.get_model(label)
+    empty = Q()
+    values = {}
+    for field_name in fields:
+        localized_field_name = build_localized_fieldname(field_name, lang)
+        # We'll only update fields which do not have an existing value
+        field_empty = empty_value_q(
+            model._meta.get_field(field_name), localized_field_name
+        )
+        empty |= field_empty
+        values[localized_field_name] = Case(
+            When(field_empty, then=F(field_name)),
+            default=F(localized_field_name),
+            output_field=model._meta.get_field(localized_field_name),
+        )
+
+    queryset = model._default_manager.rewrite(False).filter(empty)
+    if start is not None:
+        queryset = queryset.filter(pk__gte=start, pk__lt=end)
+    if rows_label is not None:
+        queryset = queryset.filter(
+            pk__in=apps.get_model(rows_label)._base_manager.values("pk")
+        )
+    return label, queryset.order_by().update(**values)
@@ -1,6 +1,12 @@
 # coding: utf-8
 import copy
+import functools
+import logging
+import threading
+import time
 import types
+from collections import defaultdict
+from contextlib import contextmanager
 
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
@@ -28,15 +34,27 @@ from wagtail.fields import StreamField, StreamValue
 from wagtail.models import Page, Site, SiteRootPath
 from wagtail.search.index import SearchField
 from wagtail.url_routing import RouteResult
+from wagtail.utils.decorators import cached_classmethod
 
-from wagtail_modeltranslation.patch_wagtailadmin_forms import patch_admin_page_form
+from wagtail_modeltranslation.patch_wagtailadmin_forms import (
+    get_selected_languages,
+    patch_admin_page_form,
+    restrict_form_languages,
+)
+from wagtail_modeltranslation.query import patch_multilingual_managers
+from wagtail_modeltranslation.rich_text import invalidate_page_url_cache
 from wagtail_modeltranslation.settings import (
     CUSTOM_COMPOSED_PANELS,
     CUSTOM_INLINE_PANELS,
     CUSTOM_SIMPLE_PANELS,
+    LAZY_PANELS,
+    LOCALE_PICKER,
+    LOCALE_PICKER_RENDER_SELECTED,
+    PATCH_ADMIN,
+    TRANSLATE_SEARCH_FIELDS,
     TRANSLATE_SLUGS,
 )
-from wagtail_modeltranslation.utils import compare_class_tree_depth
+from wagtail_modeltranslation.utils import EMPTY_STREAM_JSON, compare_class_tree_depth
 
 try:
     # Wagtail 5.0.2 onwards.
@@ -51,26 +69,73 @@ SIMPLE_PANEL_CLASSES += CUSTOM_SIMPLE_PANELS
 COMPOSED_PANEL_CLASSES = [MultiFieldPanel, FieldRowPanel] + CUSTOM_COMPOSED_PANELS
 INLINE_PANEL_CLASSES = [InlinePanel] + CUSTOM_INLINE_PANELS
 
+logger = logging.getLogger(__name__)
+
 
 class WagtailTranslator(object):
-    _patched_models = []
+    _patched_models = set()
+    # Translation options and fields looked up while patching, per model
+    _translation_fields = {}
+    _localized_fields = {}
+    _localized_search_fields = {}
+    # Seconds spent on each patching step, reported by patch_wagtail_models
+    _timings = defaultdict(float)
+    # Models whose panels are patched on their first get_edit_handler() call
+    _lazy_panel_models = set()
+    _lazy_panels_lock = threading.RLock()
 
     def __init__(self, model):
+        self.patched_model = model
+
         # Check if this class was already patched
         if model in WagtailTranslator._patched_models:
             return
 
-        self.patched_model = model
-
         if issubclass(model, Page):
             self._patch_page_models(model)
         else:
             self._patch_other_models(model)
 
-        WagtailTranslator._patched_models.append(model)
+        WagtailTranslator._patched_models.add(model)
+
+    @contextmanager
+    def _timed(self, step):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            WagtailTranslator._timings[step] += time.perf_counter() - start
+
+    @staticmethod
+    def _get_translation_fields(model):
+        """
+        Returns the fields of ``model`` registered for translation.
+        """
+        try:
+            return WagtailTranslator._translation_fields[model]
+        except KeyError:
+            fields = translator.get_options_for_model(model).all_fields
+            WagtailTranslator._translation_fields[model] = fields
+            return fields
+
+    @staticmethod
+    def _get_localized_fields(model, field_name):
+        """
+        Returns a dict mapping each language to the localized field of
+        ``field_name`` on ``model``.
+        """
+        key = (model, field_name)
+        if key not in WagtailTranslator._localized_fields:
+            WagtailTranslator._localized_fields[key] = {
+                language: model._meta.get_field(
+                    build_localized_fieldname(field_name, language)
+                )
+                for language in mt_settings.AVAILABLE_LANGUAGES
+            }
+        return WagtailTranslator._localized_fields[key]
 
     def _patch_fields(self, model):
-        translation_registered_fields = translator.get_options_for_model(model).all_fields
+        translation_registered_fields = self._get_translation_fields(model)
 
         model_fields = model._meta.get_fields()
         for field in model_fields:
@@ -83,7 +148,42 @@ class WagtailTranslator(object):
 
     def _patch_page_models(self, model):
         # PANEL PATCHING
+        if PATCH_ADMIN:
+            with self._timed("panels"):
+                if LAZY_PANELS:
+                    self._patch_panel_fields(model)
+                    WagtailTranslator._lazy_panel_models.add(model)
+                else:
+                    self._patch_page_panels(model)
+
+        # SEARCH FIELDS PATCHING
+        if TRANSLATE_SEARCH_FIELDS:
+            with self._timed("search_fields"):
+                self._patch_search_fields(model)
+
+        # PATCH FIELDS
+        with self._timed("fields"):
+            self._patch_fields(model)
 
+        # OVERRIDE CLEAN METHOD
+        if PATCH_ADMIN:
+            with self._timed("form"):
+                model.base_form_class = patch_admin_page_form(model.base_form_class)
+
+        # OVERRIDE PAGE METHODS
+        if TRANSLATE_SLUGS:
+            model.set_url_path = _new_set_url_path
+            model.route = _new_route
+            model._update_descendant_url_paths = _new_update_descendant_url_paths
+            if not hasattr(model, "_get_site_root_paths"):
+                model.get_url_parts = _new_get_url_parts  # Wagtail<1.11
+            model._get_site_root_paths = _new_get_site_root_paths
+            _patch_clean(model)
+
+            if not model.save.__name__.startswith("localized"):
+                setattr(model, "save", LocalizedSaveDescriptor(model.save))
+
+    def _patch_page_panels(self, model):
         # Check if the model has a custom edit handler
         if hasattr(model, "edit_handler"):
             tabs = model.edit_handler.children
@@ -106,47 +206,126 @@ class WagtailTranslator(object):
         # the edit_handler based on the patched panels
         model.get_edit_handler.cache_clear()
 
-        # SEARCH FIELDS PATCHING
-
-        translation_registered_fields = translator.get_options_for_model(model).all_fields
+    def _patch_search_fields(self, model):
+        translation_registered_fields = self._get_translation_fields(model)
 
+        translated_fields = []
         for field in model.search_fields:
             # Check if the field is a SearchField and if it is one of the fields registered for translation
             if (
                 isinstance(field, SearchField)
                 and field.field_name in translation_registered_fields
             ):
-                # If it is we create a clone of the original SearchField to keep all the defined options
-                # and replace its name by the translated one
-                for language in mt_settings.AVAILABLE_LANGUAGES:
-                    translated_field = copy.deepcopy(field)
-                    translated_field.field_name = build_localized_fieldname(
-                        field.field_name, language
-                    )
-                    model.search_fields = list(model.search_fields) + [translated_field]
+                translated_fields += self._get_localized_search_fields(field)
+
+        if translated_fields:
+            model.search_fields = list(model.search_fields) + translated_fields
 
+    @staticmethod
+    def _get_localized_search_fields(field):
+        """
+        Returns a clone of the original SearchField per language, keeping all the
+        defined options and replacing its name by the translated one. Subclasses
+        inheriting the same SearchField share its clones.
+        """
+        if field not in WagtailTranslator._localized_search_fields:
+            translated_fields = []
+            for language in mt_settings.AVAILABLE_LANGUAGES:
+                translated_field = copy.deepcopy(field)
+                translated_field.field_name = build_localized_fieldname(
+                    field.field_name, language
+                )
+                translated_fields.append(translated_field)
+            WagtailTranslator._localized_search_fields[field] = translated_fields
+        return WagtailTranslator._localized_search_fields[field]
+
+    def _patch_other_models(self, model):
         # PATCH FIELDS
-        self._patch_fields(model)
+        with self._timed("fields"):
+            self._patch_fields(model)
 
-        # OVERRIDE CLEAN METHOD
-        model.base_form_class = patch_admin_page_form(model.base_form_class)
+        if not PATCH_ADMIN:
+            return
 
-        # OVERRIDE PAGE METHODS
-        if TRANSLATE_SLUGS:
-            model.set_url_path = _new_set_url_path
-            model.route = _new_route
-            model._update_descendant_url_paths = _new_update_descendant_url_paths
-            if not hasattr(model, "_get_site_root_paths"):
-                model.get_url_parts = _new_get_url_parts  # Wagtail<1.11
-            model._get_site_root_paths = _new_get_site_root_paths
-            _patch_clean(model)
+        with self._timed("panels"):
+            # Only snippets have an edit handler hook to patch their panels from
+            if LAZY_PANELS and hasattr(model, "snippet_viewset"):
+                self._patch_panel_fields(model)
+                WagtailTranslator._lazy_panel_models.add(model)
+            else:
+                self._patch_other_panels(model)
 
-            if not model.save.__name__.startswith("localized"):
-                setattr(model, "save", LocalizedSaveDescriptor(model.save))
+    @staticmethod
+    def patch_lazy_panels(model):
+        """
+        Patches the panels of ``model`` if they were left for its first
+        get_edit_handler() call.
+        """
+        if model not in WagtailTranslator._lazy_panel_models:
+            return
 
-    def _patch_other_models(self, model):
-        # PATCH FIELDS
-        self._patch_fields(model)
+        with WagtailTranslator._lazy_panels_lock:
+            if model not in WagtailTranslator._lazy_panel_models:
+                return
+            WagtailTranslator._lazy_panel_models.discard(model)
+
+            translator = WagtailTranslator(model)
+            if issubclass(model, Page):
+                translator._patch_page_panels(model)
+            else:
+                translator._patch_other_panels(model)
+
+    def _patch_panel_fields(self, model):
+        """
+        Applies the changes patching the panels of ``model`` makes to their
+        fields, without building any panel, so fields validate the same way
+        whether its panels were patched yet or not.
+        """
+        if hasattr(model, "edit_handler"):
+            panel_lists = [tab.children for tab in model.edit_handler.children]
+        elif issubclass(model, Page):
+            panel_lists = [
+                getattr(model, attr)
+                for attr in ("content_panels", "promote_panels", "settings_panels")
+                if hasattr(model, attr)
+            ]
+        elif hasattr(model, "panels"):
+            panel_lists = [model.panels]
+        else:
+            # Translated fields are left out of snippet viewset object lists
+            edit_handler = getattr(model.snippet_viewset, "edit_handler", None)
+            if edit_handler is None or isinstance(edit_handler, ObjectList):
+                panel_lists = []
+            else:
+                panel_lists = [tab.children for tab in edit_handler.children]
+
+        for panels in panel_lists:
+            self._patch_panels_fields(panels)
+
+    def _patch_panels_fields(self, panels_list, related_model=None):
+        current_patching_model = related_model or self.patched_model
+
+        for panel in panels_list:
+            if panel.__class__ in SIMPLE_PANEL_CLASSES:
+                translation_registered_fields = self._get_translation_fields(
+                    current_patching_model
+                )
+                if panel.field_name in translation_registered_fields:
+                    self._patch_localized_fields(
+                        current_patching_model, panel.field_name
+                    )
+            elif panel.__class__ in COMPOSED_PANEL_CLASSES:
+                self._patch_panels_fields(panel.children, related_model)
+            elif panel.__class__ in INLINE_PANEL_CLASSES:
+                relation = getattr(current_patching_model, panel.relation_name)
+                inline_model = relation.rel.related_model
+                try:
+                    inline_panels = self._get_inline_panels(inline_model)
+                except NotRegistered:
+                    continue
+                self._patch_panels_fields(inline_panels, inline_model)
+
+    def _patch_other_panels(self, model):
         if hasattr(model, "edit_handler"):
             edit_handler = model.edit_handler
             for tab in edit_handler.children:
@@ -168,9 +347,7 @@ class WagtailTranslator(object):
             model.edit_handler = edit_handler.bind_to_model(model=model)
 
     def _patch_ObjectList(self, obj_list, model):
-        translation_registered_fields = translator.get_options_for_model(
-            model
-        ).all_fields
+        translation_registered_fields = self._get_translation_fields(model)
         panels = list(
             filter(
                 lambda field: field.field_name not in translation_registered_fields,
@@ -206,33 +383,19 @@ class WagtailTranslator(object):
     def _patch_simple_panel(self, model, original_panel):
         panel_class = original_panel.__class__
         translated_panels = []
-        translation_registered_fields = translator.get_options_for_model(model).all_fields
+        translation_registered_fields = self._get_translation_fields(model)
 
         # If the panel field is not registered for translation
         # the original one is returned
         if original_panel.field_name not in translation_registered_fields:
             return [original_panel]
 
-        original_field = model._meta.get_field(original_panel.field_name)
+        self._patch_localized_fields(model, original_panel.field_name)
         for language in mt_settings.AVAILABLE_LANGUAGES:
             localized_field_name = build_localized_fieldname(
                 original_panel.field_name, language
             )
 
-            # if the original field is required and the current language is the default one
-            # this field's blank property is set to False
-            if not original_field.blank and language == mt_settings.DEFAULT_LANGUAGE:
-                localized_field = model._meta.get_field(localized_field_name)
-                localized_field.blank = False
-            elif isinstance(original_field, StreamField):
-                # otherwise the field is optional and
-                # if it's a StreamField the stream_block need to be changed to non required
-                localized_field = model._meta.get_field(localized_field_name)
-                new_stream_block = copy.copy(localized_field.stream_block)
-                new_stream_block.meta = copy.copy(localized_field.stream_block.meta)
-                new_stream_block.meta.required = False
-                localized_field.stream_block = new_stream_block
-
             if panel_class == TitleFieldPanel:
                 if TRANSLATE_SLUGS:
                     # When a title field is changed its corresponding localized slug may need to
@@ -273,6 +436,27 @@ class WagtailTranslator(object):
 
         return translated_panels
 
+    def _patch_localized_fields(self, model, field_name):
+        original_field = model._meta.get_field(field_name)
+        localized_fields = self._get_localized_fields(model, field_name)
+        for language in mt_settings.AVAILABLE_LANGUAGES:
+            localized_field = localized_fields[language]
+
+            # if the original field is required and the current language is the default one
+            # this field's blank property is set to False
+            if not original_field.blank and language == mt_settings.DEFAULT_LANGUAGE:
+                localized_field.blank = False
+            elif (
+                isinstance(original_field, StreamField)
+                and localized_field.stream_block.meta.required
+            ):
+                # otherwise the field is optional and
+                # if it's a StreamField the stream_block need to be changed to non required
+                new_stream_block = copy.copy(localized_field.stream_block)
+                new_stream_block.meta = copy.copy(localized_field.stream_block.meta)
+                new_stream_block.meta.required = False
+                localized_field.stream_block = new_stream_block
+
     def _patch_composed_panel(self, original_panel, related_model=None):
         panel_class = original_panel.__class__
         patched_children_panels = self._patch_panels(
@@ -299,31 +483,33 @@ class WagtailTranslator(object):
         # If the related model is not registered for translation there is nothing
         # for us to do
         try:
-            translator.get_options_for_model(related_model)
+            panels = self._get_inline_panels(related_model)
         except NotRegistered:
             pass
         else:
-            if not hasattr(related_model, "panels"):
-                panels = extract_panel_definitions_from_model_class(related_model)
-                translation_registered_fields = translator.get_options_for_model(
-                    related_model
-                ).all_fields
-                panels = list(
-                    filter(
-                        lambda field: field.field_name
-                        not in translation_registered_fields,
-                        panels,
-                    )
-                )
-                related_model.panels = panels
-            related_model.panels = self._patch_panels(
-                getattr(related_model, "panels", []), related_model
-            )
+            related_model.panels = self._patch_panels(panels, related_model)
 
         # The original panel is returned as only the related_model panels need to be
         # patched, leaving the original untouched
         return panel
 
+    def _get_inline_panels(self, related_model):
+        """
+        Returns the panels of the inline ``related_model``, or the panels of its
+        fields but the translated ones when it has none. Raises NotRegistered
+        if it isn't registered for translation.
+        """
+        translation_registered_fields = self._get_translation_fields(related_model)
+        if hasattr(related_model, "panels"):
+            return related_model.panels
+        panels = extract_panel_definitions_from_model_class(related_model)
+        return list(
+            filter(
+                lambda field: field.field_name not in translation_registered_fields,
+                panels,
+            )
+        )
+
 
 # Overridden Page methods adapted to the translated fields
 
@@ -661,6 +847,8 @@ class LocalizedSaveDescriptor(object):
         # update children localized paths if any language had it slug changed
         if change_descendant_url_path:
             _update_translation_descendant_url_paths(old_record, instance)
+            # cached rich text links to this page or its descendants are now stale
+            invalidate_page_url_cache(instance.path)
 
         # Check if this is a root page of any sites and clear the 'wagtail_site_root_paths_XX' key if so
         if Site.objects.filter(root_page=instance).exists():
@@ -673,6 +861,23 @@ class LocalizedSaveDescriptor(object):
         return types.MethodType(self, instance) if instance else self
 
 
+def _is_empty_stream(val):
+    """
+    Returns whether the stream ``val`` has no blocks, judging from its raw
+    stored JSON so none of its blocks are converted to python, or None when
+    ``val`` isn't a stream.
+    """
+    if val is None:
+        return True
+    if isinstance(val, str):
+        return val.strip() in EMPTY_STREAM_JSON
+    if isinstance(val, StreamValue):
+        # raw_data is a view on the stored block dicts, its length is known
+        # without converting them
+        return len(val.raw_data) == 0
+    return None
+
+
 def _patch_stream_field_meaningful_value(field):
     old_meaningful_value = field.meaningful_value
 
@@ -680,13 +885,94 @@ def _patch_stream_field_meaningful_value(field):
         """
         Check if val is considered non-empty.
         """
-        if isinstance(val, StreamValue):
-            return len(val) != 0
+        is_empty = _is_empty_stream(val)
+        if is_empty is not None:
+            return not is_empty
         return old_meaningful_value(self, val, undefined)
 
     field.meaningful_value = meaningful_value.__get__(field)
 
 
+def _memoize_form_class(model, edit_handler):
+    """
+    Makes the edit handler of a translated model build its form class once,
+    instead of on every edit view, as its fields are multiplied by the number
+    of languages. The form class lives as long as the edit handler Wagtail
+    caches.
+    """
+    if (
+        edit_handler is not None
+        and (issubclass(model, Page) or model in WagtailTranslator._patched_models)
+        and "get_form_class" not in edit_handler.__dict__
+    ):
+        edit_handler.get_form_class = functools.cache(edit_handler.get_form_class)
+    return edit_handler
+
+
+def _render_selected_languages(edit_handler):
+    """
+    Makes the page ``edit_handler`` only render the translation fields of the
+    languages picked in the locale picker when editing a page. The fields of
+    the other languages are removed from the form, so the editor fetches their
+    panels on demand and saving leaves them untouched.
+    """
+    if edit_handler is None or "get_bound_panel" in edit_handler.__dict__:
+        return edit_handler
+
+    get_bound_panel = edit_handler.get_bound_panel
+
+    def get_selected_languages_bound_panel(
+        instance=None, request=None, form=None, prefix="panel"
+    ):
+        if (
+            form is not None
+            and request is not None
+            and not form.is_bound
+            and form.instance.pk
+            and not hasattr(form, "rendered_languages")
+        ):
+            restrict_form_languages(form, get_selected_languages(request))
+        return get_bound_panel(
+            instance=instance, request=request, form=form, prefix=prefix
+        )
+
+    edit_handler.get_bound_panel = get_selected_languages_bound_panel
+    return edit_handler
+
+
+def _install_edit_handler_hooks():
+    """
+    Wraps the edit handler getters of pages and snippet viewsets so the panels
+    of a model are patched right before its edit handler is built, when they
+    were left for then, the form class of the edit handler is memoized and
+    page editors render the picked languages only, if enabled.
+    """
+    from wagtail.admin.viewsets.model import ModelViewSet
+
+    if getattr(ModelViewSet.get_edit_handler, "patches_edit_handler", False):
+        return
+
+    page_get_edit_handler = Page.__dict__["get_edit_handler"].fn
+
+    def get_page_edit_handler(cls):
+        WagtailTranslator.patch_lazy_panels(cls)
+        edit_handler = _memoize_form_class(cls, page_get_edit_handler(cls))
+        if LOCALE_PICKER and LOCALE_PICKER_RENDER_SELECTED:
+            edit_handler = _render_selected_languages(edit_handler)
+        return edit_handler
+
+    Page.get_edit_handler = cached_classmethod(get_page_edit_handler)
+
+    viewset_get_edit_handler = ModelViewSet.get_edit_handler
+
+    def get_viewset_edit_handler(self):
+        WagtailTranslator.patch_lazy_panels(self.model)
+        return _memoize_form_class(self.model, viewset_get_edit_handler(self))
+
+    get_viewset_edit_handler.patches_edit_handler = True
+    ModelViewSet.get_edit_handler = get_viewset_edit_handler
+
+
 def patch_wagtail_models():
     # After all models being registered the Page or BaseSiteSetting subclasses and snippets are patched
     registered_models = translator.get_registered_models()
@@ -696,5 +982,24 @@ def patch_wagtail_models():
     # reflected in the superclass
     registered_models.sort(key=compare_class_tree_depth)
 
+    start = time.perf_counter()
+    WagtailTranslator._timings.clear()
+
     for model_class in registered_models:
         WagtailTranslator(model_class)
+
+    if PATCH_ADMIN:
+        _install_edit_handler_hooks()
+
+    patch_multilingual_managers()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Patched %d models in %.3fs (%s)",
+            len(registered_models),
+            time.perf_counter() - start,
+            ", ".join(
+                "%s: %.3fs" % (step, seconds)
+                for step, seconds in sorted(WagtailTranslator._timings.items())
+            ),
+        )
@@ -1,5 +1,7 @@
 # coding: utf-8
 
+import json
+
 from django import forms
 from django.conf import settings
 from django.core.exceptions import ValidationError
@@ -7,6 +9,8 @@ from django.utils import translation
 from django.utils.translation import activate, get_language
 from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
+from modeltranslation import settings as mt_settings
+from modeltranslation.translator import NotRegistered, translator
 from modeltranslation.utils import build_localized_fieldname
 from wagtail.admin import widgets
 from wagtail.admin.forms.pages import CopyForm
@@ -14,6 +18,101 @@ from wagtail.models import Page
 
 from wagtail_modeltranslation import settings as wmt_settings
 
+# Cookie holding the languages picked in the locale picker, per browser rather
+# than per user
+LOCALE_PICKER_COOKIE = "wagtail_modeltranslation_locales"
+# Hidden page form field the editor fills with the languages it changed
+CHANGED_LANGUAGES_FIELD = "wagtail_modeltranslation_changed_languages"
+
+_field_languages = {}
+
+
+def get_field_languages(model):
+    """
+    Returns the language of each translation field of ``model``, by name.
+    """
+    if model not in _field_languages:
+        try:
+            opts = translator.get_options_for_model(model)
+        except NotRegistered:
+            _field_languages[model] = {}
+        else:
+            _field_languages[model] = {
+                field.name: field.language
+                for translation_fields in opts.all_fields.values()
+                for field in translation_fields
+            }
+    return _field_languages[model]
+
+
+def get_selected_languages(request):
+    """
+    Returns the languages picked in the locale picker of ``request``, or the
+    ones it shows by default.
+    """
+    picked = request.COOKIES.get(LOCALE_PICKER_COOKIE, "").split(",")
+    languages = [
+        language for language in mt_settings.AVAILABLE_LANGUAGES if language in picked
+    ]
+    return (
+        languages
+        or wmt_settings.LOCALE_PICKER_DEFAULT
+        or [mt_settings.DEFAULT_LANGUAGE]
+    )
+
+
+def get_posted_languages(form):
+    """
+    Returns the languages of the translation fields the data of the bound
+    ``form`` has values for. A language none of whose fields can tell an
+    omitted value apart, such as checkboxes, counts as posted.
+    """
+    field_languages = get_field_languages(form._meta.model)
+    detectable, posted = set(), set()
+    for name, field in form.fields.items():
+        language = field_languages.get(name)
+        if language is None or not field.widget.value_omitted_from_data({}, {}, name):
+            continue
+        detectable.add(language)
+        if not field.widget.value_omitted_from_data(
+            form.data, form.files, form.add_prefix(name)
+        ):
+            posted.add(language)
+    return [
+        language
+        for language in mt_settings.AVAILABLE_LANGUAGES
+        if language in posted or language not in detectable
+    ]
+
+
+def get_changed_languages(form):
+    """
+    Returns the languages the editor posting the bound ``form`` found changed
+    by comparing the raw values of their fields, or every language if it
+    didn't tell. No field is deserialized to find out.
+    """
+    changed = form.data.get(form.add_prefix(CHANGED_LANGUAGES_FIELD))
+    if changed is None:
+        return list(mt_settings.AVAILABLE_LANGUAGES)
+    changed = changed.split(",")
+    return [
+        language for language in mt_settings.AVAILABLE_LANGUAGES if language in changed
+    ]
+
+
+def restrict_form_languages(form, languages, keep_untranslated=True):
+    """
+    Removes the translation fields of the languages other than ``languages``
+    from ``form``, so they are neither rendered nor saved, along with the
+    untranslated fields unless ``keep_untranslated``.
+    """
+    field_languages = get_field_languages(form._meta.model)
+    for name in list(form.fields):
+        language = field_languages.get(name)
+        if language not in languages and (language or not keep_untranslated):
+            del form.fields[name]
+    form.rendered_languages = languages
+
 
 class PatchedCopyForm(CopyForm):
     def __init__(self, *args, **kwargs):
@@ -153,6 +252,62 @@ def patch_admin_page_form(current_page_form):
         Validate unicity of the slugs in every language. Take fallbacks into account.
         """
 
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # Only the languages the editor rendered are posted, leave the others
+            # untouched
+            if (
+                wmt_settings.LOCALE_PICKER_RENDER_SELECTED
+                and self.is_bound
+                and self.instance.pk
+            ):
+                restrict_form_languages(self, get_posted_languages(self))
+            # The editor tells the languages it changed in a hidden field, which
+            # maps the translation fields to their language
+            if wmt_settings.SAVE_CHANGED_LANGUAGES and self.instance.pk:
+                field_languages = get_field_languages(self._meta.model)
+                fields = {
+                    name: field_languages[name]
+                    for name in self.fields
+                    if name in field_languages
+                }
+                self.fields[CHANGED_LANGUAGES_FIELD] = forms.CharField(
+                    required=False,
+                    widget=forms.HiddenInput(
+                        attrs={
+                            "data-wagtail-modeltranslation-fields": json.dumps(fields)
+                        }
+                    ),
+                )
+
+        def full_clean(self):
+            if not (
+                wmt_settings.SAVE_CHANGED_LANGUAGES
+                and self.is_bound
+                and self.instance.pk
+            ):
+                return super().full_clean()
+
+            # Only clean and save the languages whose values were changed. The
+            # fields of the others stay in the form, to be rendered again if
+            # it has errors, along with the languages to save on resubmission
+            fields = self.fields
+            languages = get_changed_languages(self)
+            if CHANGED_LANGUAGES_FIELD in fields:
+                fields[CHANGED_LANGUAGES_FIELD].widget.attrs[
+                    "data-wagtail-modeltranslation-changed"
+                ] = ",".join(languages)
+            field_languages = get_field_languages(self._meta.model)
+            self.fields = {
+                name: field
+                for name, field in fields.items()
+                if name not in field_languages or field_languages[name] in languages
+            }
+            try:
+                super().full_clean()
+            finally:
+                self.fields = fields
+
         def clean(self):
             cleaned_data = super().clean()
 
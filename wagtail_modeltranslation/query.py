@@ -0,0 +1,66 @@
+"""
+Deferred loading of the translation fields a request doesn't read.
+"""
+
+from django.db.models import QuerySet
+from modeltranslation.manager import MultilingualManager, MultilingualQuerySet
+from modeltranslation.translator import NotRegistered, translator
+from modeltranslation.utils import get_language, resolution_order
+
+_inactive_translation_fields = {}
+
+
+def get_inactive_translation_fields(model, language=None):
+    """
+    Returns the names of the translation fields of ``model`` that neither
+    ``language``, by default the active one, nor its fallback languages read.
+    """
+    language = language or get_language()
+    key = (model, language)
+    if key not in _inactive_translation_fields:
+        try:
+            opts = translator.get_options_for_model(model)
+        except NotRegistered:
+            _inactive_translation_fields[key] = []
+            return []
+
+        field_names = []
+        for field_name, translation_fields in opts.all_fields.items():
+            fallback_languages = getattr(
+                getattr(model, field_name, None), "fallback_languages", None
+            )
+            languages = resolution_order(language, fallback_languages)
+            field_names.extend(
+                field.name
+                for field in translation_fields
+                if field.language not in languages
+                and field.concrete
+                and not field.many_to_many
+            )
+        _inactive_translation_fields[key] = sorted(field_names)
+    return _inactive_translation_fields[key]
+
+
+def defer_translations(self, language=None):
+    """
+    Returns a copy of the queryset deferring the translation fields neither
+    ``language``, by default the active one, nor its fallback languages read.
+    """
+    field_names = get_inactive_translation_fields(self.model, language)
+    if not field_names:
+        return self._chain()
+    # The names are already localized, skip the lookup rewriting of defer()
+    return QuerySet.defer(self, *field_names)
+
+
+def _manager_defer_translations(self, *args, **kwargs):
+    return self.get_queryset().defer_translations(*args, **kwargs)
+
+
+def patch_multilingual_managers():
+    """
+    Adds ``defer_translations`` to the managers and querysets of the models
+    registered for translation.
+    """
+    MultilingualQuerySet.defer_translations = defer_translations
+    MultilingualManager.defer_translations = _manager_defer_translations
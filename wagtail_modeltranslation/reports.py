@@ -0,0 +1,123 @@
+"""
+Translation completeness of the registered models, computed with aggregate
+queries rather than by iterating their instances.
+"""
+
+from django.db.models import (
+    BooleanField,
+    Count,
+    ExpressionWrapper,
+    ManyToManyField,
+    Q,
+)
+from modeltranslation.settings import AVAILABLE_LANGUAGES
+from modeltranslation.utils import build_localized_fieldname
+
+from wagtail_modeltranslation.management.commands.update_translation_fields import (
+    Command as UpdateTranslationFieldsCommand,
+)
+from wagtail_modeltranslation.utils import empty_value_q
+
+COMPLETENESS_HEADER = ["model", "field", "language", "total", "missing"]
+GAPS_HEADER = ["model", "id", "language", "missing fields"]
+
+
+class Echo(object):
+    """
+    File-like object returning what is written to it, for csv.writer to
+    build the rows of a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def get_report_models(app_label=None, model_name=None):
+    """
+    Returns the registered models with their translated fields, as ``(model,
+    fields)`` pairs with the fields sorted by name. The fields inherited from
+    a concrete parent are reported with the parent when it is selected too.
+    """
+    fields_command = UpdateTranslationFieldsCommand()
+    models = fields_command.get_models(
+        {"app_label": app_label, "model_name": model_name}
+    )
+    model_fields = {}
+    for model, field_names, rows_model in fields_command.get_table_fields(models):
+        model = rows_model or model
+        model_fields.setdefault(model, []).extend(
+            field
+            for field in map(model._meta.get_field, field_names)
+            if not isinstance(field, ManyToManyField)
+        )
+    return [
+        (model, sorted(fields, key=lambda field: field.name))
+        for model, fields in model_fields.items()
+        if fields
+    ]
+
+
+def get_completeness_rows(report_models, languages=None):
+    """
+    Yields the number of rows of each model and how many of them miss each
+    translated field, per language, with a single query per model.
+    """
+    languages = languages or AVAILABLE_LANGUAGES
+    for model, fields in report_models:
+        aggregates = {"total": Count("pk")}
+        for field in fields:
+            for language in languages:
+                field_name = build_localized_fieldname(field.name, language)
+                aggregates[field_name] = Count(
+                    "pk", filter=empty_value_q(field, field_name)
+                )
+        counts = model._default_manager.rewrite(False).aggregate(**aggregates)
+
+        for field in fields:
+            for language in languages:
+                yield [
+                    model._meta.label,
+                    field.name,
+                    language,
+                    counts["total"],
+                    counts[build_localized_fieldname(field.name, language)],
+                ]
+
+
+def get_gap_rows(report_models, languages=None, chunk_size=2000):
+    """
+    Yields the instances missing any translated field in a language, with the
+    fields they miss, streaming the results of a single query per model.
+    """
+    languages = languages or AVAILABLE_LANGUAGES
+    for model, fields in report_models:
+        annotations = {}
+        any_missing = Q()
+        for language in languages:
+            for field in fields:
+                field_name = build_localized_fieldname(field.name, language)
+                empty = empty_value_q(field, field_name)
+                annotations["missing_%s" % field_name] = ExpressionWrapper(
+                    empty, output_field=BooleanField()
+                )
+                any_missing |= empty
+
+        rows = (
+            model._default_manager.rewrite(False)
+            .filter(any_missing)
+            .annotate(**annotations)
+            .order_by("pk")
+            .values_list("pk", *annotations)
+            .iterator(chunk_size=chunk_size)
+        )
+        for row in rows:
+            missing = iter(row[1:])
+            for language in languages:
+                missing_fields = [field.name for field in fields if next(missing)]
+                if missing_fields:
+                    yield [
+                        model._meta.label,
+                        row[0],
+                        language,
+                        " ".join(missing_fields),
+                    ]
@@ -0,0 +1,327 @@
+import io
+import uuid
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.wsgi import WSGIRequest
+from django.utils.html import escape
+from modeltranslation.utils import get_language
+from wagtail import VERSION as WAGTAIL_VERSION
+from wagtail.models import Page, Site
+from wagtail.rich_text.pages import PageLinkHandler
+from wagtail.rich_text.rewriters import FIND_A_TAG, LinkRewriter, extract_attrs
+
+from wagtail_modeltranslation.settings import PAGE_URL_CACHE_TIMEOUT, TRANSLATE_SLUGS
+
+PAGE_URL_CACHE_VERSION_KEY = "wagtail_modeltranslation_page_urls_version"
+PAGE_URL_SUBTREE_VERSION_KEY = "wagtail_modeltranslation_page_urls_version_{}"
+
+# Per-request memo of localized page URLs, keyed by (language, page id). It is
+# only active while a request is being served, see ``start_page_url_memo``.
+_page_url_memo = Local()
+# Memoized for the ids of pages that don't exist
+_NO_PAGE = object()
+
+
+def start_page_url_memo(environ=None, scope=None, **kwargs):
+    _page_url_memo.urls = {}
+    _page_url_memo.environ = environ
+    _page_url_memo.scope = scope
+    _page_url_memo.request = None
+
+
+def clear_page_url_memo(**kwargs):
+    _page_url_memo.urls = None
+    _page_url_memo.environ = None
+    _page_url_memo.scope = None
+    _page_url_memo.request = None
+
+
+def _get_memo():
+    return getattr(_page_url_memo, "urls", None)
+
+
+def _get_memo_request():
+    """
+    Returns a request for the one being served, built on first use, so page
+    urls are computed for its site and share its site root paths lookup.
+    """
+    if getattr(_page_url_memo, "request", None) is None:
+        environ = getattr(_page_url_memo, "environ", None)
+        scope = getattr(_page_url_memo, "scope", None)
+        if environ is not None:
+            _page_url_memo.request = WSGIRequest(environ)
+        elif scope is not None:
+            _page_url_memo.request = ASGIRequest(scope, io.BytesIO())
+    return getattr(_page_url_memo, "request", None)
+
+
+@contextmanager
+def page_url_memo():
+    """
+    Memoizes localized page urls within the block, unless a request being
+    served already does.
+    """
+    if _get_memo() is not None:
+        yield
+        return
+    start_page_url_memo()
+    try:
+        yield
+    finally:
+        clear_page_url_memo()
+
+
+def _page_url_cache_enabled():
+    # Without translated slugs pages aren't saved through LocalizedSaveDescriptor,
+    # which is what tells us when urls change
+    return TRANSLATE_SLUGS and bool(PAGE_URL_CACHE_TIMEOUT)
+
+
+def _get_page_url_cache_version():
+    version = cache.get(PAGE_URL_CACHE_VERSION_KEY)
+    if version is None:
+        cache.add(PAGE_URL_CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(PAGE_URL_CACHE_VERSION_KEY)
+    return version
+
+
+def _page_url_cache_key(version, site_id, language, page_id):
+    # Urls of pages of the site being served are relative, the others absolute
+    return "wagtail_modeltranslation_page_url_{}_{}_{}_{}".format(
+        version, site_id, language, page_id
+    )
+
+
+def _get_ancestor_paths(path):
+    return [path[:end] for end in range(Page.steplen, len(path) + 1, Page.steplen)]
+
+
+def _get_subtree_versions(paths):
+    """
+    Returns the cache versions of the subtrees of the pages at ``paths`` and
+    of their ancestors, by path. A version missing from the cache is replaced
+    by a new one, which invalidates the urls cached in its subtree.
+    """
+    cache_keys = {
+        PAGE_URL_SUBTREE_VERSION_KEY.format(ancestor_path): ancestor_path
+        for path in paths
+        for ancestor_path in _get_ancestor_paths(path)
+    }
+    versions = cache.get_many(cache_keys)
+    missing = {
+        cache_key: uuid.uuid4().hex
+        for cache_key in cache_keys
+        if cache_key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {cache_keys[cache_key]: version for cache_key, version in versions.items()}
+
+
+def _get_page_versions(path, subtree_versions):
+    """
+    Returns the versions of the subtrees the page at ``path`` belongs to, which
+    its cached url is only valid for.
+    """
+    return [
+        subtree_versions[ancestor_path] for ancestor_path in _get_ancestor_paths(path)
+    ]
+
+
+def invalidate_page_url_cache(path=None):
+    """
+    Drops the cached urls of the pages in the subtree of the page at ``path``,
+    or every cached page url. Urls of a whole subtree change with a single
+    slug, so rather than tracking descendants the cached urls are stored with
+    the versions of the subtrees they belong to, and the version of the
+    changed subtree is replaced.
+    """
+    if path is None:
+        cache.set(PAGE_URL_CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+    else:
+        cache.set(PAGE_URL_SUBTREE_VERSION_KEY.format(path), uuid.uuid4().hex, None)
+    memo = _get_memo()
+    if memo:
+        memo.clear()
+
+
+def get_localized_page_urls(page_ids):
+    """
+    Returns a dict mapping each of the given page ids to its url in the current
+    language. Pages that don't exist are left out of the result. Urls are looked
+    up in the per-request memo, then in the cache, and every page still missing
+    is fetched with a single ``specific()`` query per page type.
+    """
+    language = get_language()
+    memo = _get_memo()
+    urls = {}
+    missing_ids = set()
+    for page_id in page_ids:
+        page_id = int(page_id)
+        if memo is not None and (language, page_id) in memo:
+            if memo[language, page_id] is not _NO_PAGE:
+                urls[page_id] = memo[language, page_id]
+        else:
+            missing_ids.add(page_id)
+
+    request = _get_memo_request()
+    if missing_ids and _page_url_cache_enabled():
+        version = _get_page_url_cache_version()
+        site = Site.find_for_request(request)
+        site_id = site.pk if site else ""
+        cache_keys = {
+            _page_url_cache_key(version, site_id, language, page_id): page_id
+            for page_id in missing_ids
+        }
+        cached = cache.get_many(cache_keys)
+        subtree_versions = _get_subtree_versions(
+            path for path, page_versions, url in cached.values()
+        )
+        for cache_key, (path, page_versions, url) in cached.items():
+            if page_versions != _get_page_versions(path, subtree_versions):
+                continue
+            page_id = cache_keys[cache_key]
+            urls[page_id] = url
+            missing_ids.discard(page_id)
+            if memo is not None:
+                memo[language, page_id] = url
+    else:
+        version = None
+
+    if missing_ids:
+        pages = list(
+            Page.objects.filter(id__in=missing_ids).defer_streamfields().specific()
+        )
+        for page in pages:
+            urls[page.id] = page.get_url(request=request)
+            if memo is not None:
+                memo[language, page.id] = urls[page.id]
+        if memo is not None:
+            for page_id in missing_ids.difference(urls):
+                memo[language, page_id] = _NO_PAGE
+
+        if version is not None:
+            paths = {page.id: page.path for page in pages}
+            subtree_versions = _get_subtree_versions(paths.values())
+            cache.set_many(
+                {
+                    cache_key: (
+                        paths[page_id],
+                        _get_page_versions(paths[page_id], subtree_versions),
+                        urls[page_id],
+                    )
+                    for cache_key, page_id in cache_keys.items()
+                    if page_id in missing_ids and page_id in urls
+                },
+                PAGE_URL_CACHE_TIMEOUT,
+            )
+
+    return urls
+
+
+def get_parent_page_ids(page_ids):
+    """
+    Returns a dict mapping each of the given page ids to its parent page id,
+    resolved with two queries regardless of the number of pages.
+    """
+    paths = dict(Page.objects.filter(id__in=page_ids).values_list("id", "path"))
+    parent_paths = {
+        page_id: path[: -Page.steplen]
+        for page_id, path in paths.items()
+        if len(path) > Page.steplen
+    }
+    parent_ids = dict(
+        Page.objects.filter(path__in=set(parent_paths.values())).values_list(
+            "path", "id"
+        )
+    )
+    return {
+        page_id: parent_ids.get(parent_path)
+        for page_id, parent_path in parent_paths.items()
+    }
+
+
+class LocalizedPageLinkHandler(PageLinkHandler):
+    """
+    Page link handler that expands rich text links to the url of the page in
+    the current language, resolving every link of a rich text blob at once.
+    """
+
+    @classmethod
+    def expand_db_attributes(cls, attrs, for_editor=False):
+        return cls.expand_db_attributes_many([attrs], for_editor)[0]
+
+    @classmethod
+    def expand_db_attributes_many(cls, attrs_list, for_editor=False):
+        page_ids = []
+        for attrs in attrs_list:
+            try:
+                page_ids.append(int(attrs["id"]))
+            except (KeyError, ValueError):
+                page_ids.append(None)
+
+        valid_ids = [page_id for page_id in page_ids if page_id is not None]
+        urls = get_localized_page_urls(valid_ids)
+        parent_ids = get_parent_page_ids(valid_ids) if for_editor else {}
+
+        tags = []
+        for page_id in page_ids:
+            if page_id not in urls:
+                tags.append("<a>")
+                continue
+
+            if for_editor:
+                editor_attrs = 'data-linktype="page" data-id="%d" ' % page_id
+                if parent_ids.get(page_id):
+                    editor_attrs += 'data-parent-id="%d" ' % parent_ids[page_id]
+            else:
+                editor_attrs = ""
+
+            tags.append('<a %shref="%s">' % (editor_attrs, escape(urls[page_id])))
+
+        return tags
+
+
+def _get_page_link_ids(html):
+    page_ids = []
+    for attr_string in FIND_A_TAG.findall(html):
+        attrs = extract_attrs(attr_string)
+        if attrs.get("linktype") == "page":
+            try:
+                page_ids.append(int(attrs["id"]))
+            except (KeyError, ValueError):
+                pass
+    return page_ids
+
+
+def patch_link_rewriter():
+    """
+    Wagtail before 6.1 expands the links of rich text one at a time, through
+    ``expand_db_attributes``. Resolve the urls of every page link of the html
+    at once beforehand, so each link is then served from the memo.
+    """
+    if WAGTAIL_VERSION >= (6, 1) or hasattr(LinkRewriter, "_wmt_original_call"):
+        return
+
+    original_call = LinkRewriter.__call__
+
+    def __call__(self, html):
+        handler = getattr(self.link_rules.get("page"), "__self__", None)
+        if not (
+            isinstance(handler, type) and issubclass(handler, LocalizedPageLinkHandler)
+        ):
+            return original_call(self, html)
+
+        page_ids = _get_page_link_ids(html)
+        if len(page_ids) < 2:
+            return original_call(self, html)
+        with page_url_memo():
+            get_localized_page_urls(page_ids)
+            return original_call(self, html)
+
+    LinkRewriter._wmt_original_call = original_call
+    LinkRewriter.__call__ = __call__
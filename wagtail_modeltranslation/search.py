@@ -0,0 +1,231 @@
+"""
+Search backend indexing the translated fields of a single language.
+
+Each language gets its own entry in ``WAGTAILSEARCH_BACKENDS``, wrapping the
+backend that actually stores the index::
+
+    WAGTAILSEARCH_BACKENDS = {
+        "default": {
+            "BACKEND": "wagtail_modeltranslation.search",
+            "LOCALIZED_BACKEND": "wagtail.search.backends.elasticsearch8",
+            "LANGUAGE": "en",
+            "INDEX": "wagtail_en",
+        },
+        "de": {
+            "BACKEND": "wagtail_modeltranslation.search",
+            "LOCALIZED_BACKEND": "wagtail.search.backends.elasticsearch8",
+            "LANGUAGE": "de",
+            "INDEX": "wagtail_de",
+        },
+    }
+
+Objects are indexed with the language of the backend active, so the ``title``
+search field holds ``title_de`` in the ``de`` index.
+
+When an object is saved, its document is only pushed to the backends whose
+language has changed search field values, see ``FINGERPRINT_TIMEOUT``.
+"""
+
+import hashlib
+import uuid
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+from modeltranslation.utils import get_language
+from wagtail.search.backends import get_search_backend_config, import_backend
+from wagtail.search.index import RelatedFields, get_indexed_models
+
+SEARCH_FINGERPRINT_KEY = "wagtail_modeltranslation_search_{}_{}_{}_{}_{}"
+SEARCH_FINGERPRINT_VERSION_KEY = "wagtail_modeltranslation_search_version_{}_{}"
+
+
+class LocalizedIndex(object):
+    """
+    Proxy of a backend index adding items with its language active.
+
+    With a ``fingerprint_timeout``, the search field values of each item added
+    are fingerprinted in Django's cache, and items whose values didn't change
+    since they were last added are skipped. The fingerprints are versioned per
+    index, a new version is started whenever the index is reset or rebuilt.
+    """
+
+    def __init__(self, index, language, fingerprint_timeout=0):
+        self.index = index
+        self.language = language
+        self.fingerprint_timeout = fingerprint_timeout
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+    def __eq__(self, other):
+        if isinstance(other, LocalizedIndex):
+            other = other.index
+        return self.index == other
+
+    def __hash__(self):
+        return hash(self.index)
+
+    def get_fingerprint_version_key(self):
+        return SEARCH_FINGERPRINT_VERSION_KEY.format(
+            getattr(self.index, "name", ""), self.language
+        )
+
+    def get_fingerprint_keys(self, items):
+        """
+        Returns the cache keys of the fingerprints of ``items`` in the current
+        version. A version evicted from the cache is replaced by a new one.
+        """
+        version = cache.get_or_set(
+            self.get_fingerprint_version_key(), uuid.uuid4().hex, None
+        )
+        return [
+            SEARCH_FINGERPRINT_KEY.format(
+                getattr(self.index, "name", ""),
+                version,
+                item._meta.label,
+                item.pk,
+                self.language,
+            )
+            for item in items
+        ]
+
+    def invalidate_fingerprints(self):
+        """
+        Starts a new version of the fingerprints of the index, so every item is
+        added again the next time it's saved.
+        """
+        cache.set(self.get_fingerprint_version_key(), uuid.uuid4().hex, None)
+
+    def get_fingerprint(self, item):
+        """
+        Returns a digest of the search field values of ``item`` in the active
+        language, or None if they can't be compared.
+        """
+        values = []
+        for field in type(item).get_search_fields():
+            if isinstance(field, RelatedFields):
+                return None
+            values.append((field.field_name, field.get_value(item)))
+        return hashlib.md5(repr(values).encode(), usedforsecurity=False).hexdigest()
+
+    def add_item(self, item):
+        fingerprint = None
+        with translation.override(self.language):
+            if self.fingerprint_timeout and item.pk is not None:
+                [key] = self.get_fingerprint_keys([item])
+                fingerprint = self.get_fingerprint(item)
+                if fingerprint is not None and cache.get(key) == fingerprint:
+                    return None
+            result = self.index.add_item(item)
+
+        if fingerprint is not None:
+            # A rolled back save must not keep the next one from being indexed
+            transaction.on_commit(
+                partial(cache.set, key, fingerprint, self.fingerprint_timeout),
+                using=item._state.db,
+            )
+        return result
+
+    def add_items(self, model, items):
+        if self.fingerprint_timeout:
+            items = list(items)
+            cache.delete_many(
+                self.get_fingerprint_keys(item for item in items if item.pk is not None)
+            )
+        with translation.override(self.language):
+            return self.index.add_items(model, items)
+
+    def delete_item(self, item):
+        if self.fingerprint_timeout:
+            cache.delete_many(self.get_fingerprint_keys([item]))
+        return self.index.delete_item(item)
+
+    def reset(self):
+        if self.fingerprint_timeout:
+            self.invalidate_fingerprints()
+        return self.index.reset()
+
+
+class LocalizedIndexRebuilder(object):
+    """
+    Proxy of a backend rebuilder returning localized indexes.
+    """
+
+    def __init__(self, rebuilder_class, language, index):
+        if isinstance(index, LocalizedIndex):
+            self.index = index
+            index = index.index
+        else:
+            self.index = LocalizedIndex(index, language)
+        self.rebuilder = rebuilder_class(index)
+        self.language = language
+
+    def start(self):
+        return LocalizedIndex(self.rebuilder.start(), self.language)
+
+    def finish(self):
+        result = self.rebuilder.finish()
+        # The items fingerprinted before the rebuild may be missing from the
+        # rebuilt index, or hold other values
+        self.index.invalidate_fingerprints()
+        return result
+
+
+def localize_search_backend(backend, language, fingerprint_timeout=0):
+    """
+    Makes ``backend`` index objects with ``language`` active, wrapping the
+    indexes and rebuilders it returns.
+    """
+    get_index_for_model = backend.get_index_for_model
+    reset_index = backend.reset_index
+
+    def get_localized_index_for_model(model, *args, **kwargs):
+        index = get_index_for_model(model, *args, **kwargs)
+        if index is None:
+            return None
+        return LocalizedIndex(index, language, fingerprint_timeout)
+
+    def reset_localized_index():
+        result = reset_index()
+        for model in get_indexed_models():
+            index = get_localized_index_for_model(model)
+            if index is not None:
+                index.invalidate_fingerprints()
+        return result
+
+    backend.language = language
+    backend.get_index_for_model = get_localized_index_for_model
+    backend.reset_index = reset_localized_index
+    if backend.rebuilder_class is not None:
+        backend.rebuilder_class = partial(
+            LocalizedIndexRebuilder, backend.rebuilder_class, language
+        )
+    return backend
+
+
+def SearchBackend(params):
+    """
+    Builds the ``LOCALIZED_BACKEND`` of ``params`` for its ``LANGUAGE``, the
+    name Wagtail looks up in backend modules. Backend modules may provide a
+    factory rather than a class, so the built backend is wrapped instead of
+    subclassed.
+    """
+    params = params.copy()
+    language = params.pop("LANGUAGE")
+    fingerprint_timeout = params.pop("FINGERPRINT_TIMEOUT", 3600)
+    backend = import_backend(params.pop("LOCALIZED_BACKEND"))(params)
+    return localize_search_backend(backend, language, fingerprint_timeout)
+
+
+def get_search_backend_name(language=None):
+    """
+    Returns the name of the search backend configured for ``language``, the
+    active language by default, or ``"default"`` if there's none.
+    """
+    language = language or get_language()
+    for name, params in get_search_backend_config().items():
+        if params.get("LANGUAGE") == language:
+            return name
+    return "default"
@@ -31,3 +31,23 @@ LOCALE_PICKER_DEFAULT = getattr(
 LOCALE_PICKER_RESTORE = getattr(
     settings, "WAGTAILMODELTRANSLATION_LOCALE_PICKER_RESTORE", False
 )
+LOCALE_PICKER_RENDER_SELECTED = getattr(
+    settings, "WAGTAILMODELTRANSLATION_LOCALE_PICKER_RENDER_SELECTED", False
+)
+SAVE_CHANGED_LANGUAGES = getattr(
+    settings, "WAGTAILMODELTRANSLATION_SAVE_CHANGED_LANGUAGES", False
+)
+PAGE_URL_CACHE_TIMEOUT = getattr(
+    settings, "WAGTAILMODELTRANSLATION_PAGE_URL_CACHE_TIMEOUT", 3600
+)
+LAZY_PANELS = getattr(settings, "WAGTAILMODELTRANSLATION_LAZY_PANELS", False)
+PATCH_ADMIN = getattr(settings, "WAGTAILMODELTRANSLATION_PATCH_ADMIN", True)
+TRANSLATE_SEARCH_FIELDS = getattr(
+    settings, "WAGTAILMODELTRANSLATION_TRANSLATE_SEARCH_FIELDS", True
+)
+TRANSLATION_PROVIDER = getattr(
+    settings, "WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER", None
+)
+TRANSLATION_PROVIDER_OPTIONS = getattr(
+    settings, "WAGTAILMODELTRANSLATION_TRANSLATION_PROVIDER_OPTIONS", {}
+)
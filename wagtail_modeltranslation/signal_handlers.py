@@ -1,19 +1,51 @@
 from django.core.cache import cache
-from django.db.models.signals import post_delete, post_save
+from django.core.signals import request_finished, request_started
+from django.db.models.signals import post_delete, post_save, pre_save
 from modeltranslation import settings as mt_settings
-from wagtail.models import Site
+from wagtail.models import Page, Site
 from wagtail.signals import post_page_move
 
+from wagtail_modeltranslation.rich_text import (
+    clear_page_url_memo,
+    invalidate_page_url_cache,
+    start_page_url_memo,
+)
+
+
+def pre_save_site_signal_handler(instance, **kwargs):
+    # The pages of the previous root page lose the site, remember their subtree
+    instance._root_page_path_before = (
+        Page.objects.filter(sites_rooted_here=instance.pk)
+        .values_list("path", flat=True)
+        .first()
+    )
+
 
 # Clear the wagtail_site_root_paths_XX from the cache whenever Site records are updated.
 def post_save_site_signal_handler(instance, update_fields=None, **kwargs):
     for language in mt_settings.AVAILABLE_LANGUAGES:
         cache.delete("wagtail_site_root_paths_{}".format(language))
+    root_page_path_before = getattr(instance, "_root_page_path_before", None)
+    if root_page_path_before is not None:
+        invalidate_page_url_cache(root_page_path_before)
+    invalidate_page_url_cache(instance.root_page.path)
 
 
 def post_delete_site_signal_handler(instance, **kwargs):
     for language in mt_settings.AVAILABLE_LANGUAGES:
         cache.delete("wagtail_site_root_paths_{}".format(language))
+    # The root page may be deleted along with the site, and its subtree with it
+    root_page_path = (
+        Page.objects.filter(id=instance.root_page_id)
+        .values_list("path", flat=True)
+        .first()
+    )
+    if root_page_path is not None:
+        invalidate_page_url_cache(root_page_path)
+
+
+def post_delete_page_signal_handler(instance, **kwargs):
+    invalidate_page_url_cache(instance.path)
 
 
 # with this approach, we are doing multiple saves on object
@@ -26,10 +58,18 @@ def post_moved_handler(sender, **kwargs):
 
     kwargs["instance"].set_url_path(kwargs["parent_page_after"])
     kwargs["instance"].save()
+    # The cached urls of the moved pages are stored under their former parent
+    invalidate_page_url_cache(kwargs["parent_page_before"].path)
 
 
 def register_signal_handlers():
+    pre_save.connect(pre_save_site_signal_handler, sender=Site)
     post_save.connect(post_save_site_signal_handler, sender=Site)
     post_delete.connect(post_delete_site_signal_handler, sender=Site)
 
     post_page_move.connect(post_moved_handler)
+    post_delete.connect(post_delete_page_signal_handler, sender=Page)
+
+    # Localized rich text page link urls are memoized for the duration of a request
+    request_started.connect(start_page_url_memo)
+    request_finished.connect(clear_page_url_memo)
@@ -0,0 +1,61 @@
+/*
+ * Fills the hidden field of page forms listing the languages whose fields
+ * were changed, by comparing their raw values on submit with the ones they
+ * had once the widgets were set up. The server then only cleans and saves
+ * those languages.
+ */
+document.addEventListener('DOMContentLoaded', () => {
+  const input = document.querySelector('input[data-wagtail-modeltranslation-fields]');
+  if (input === null) return;
+
+  const form = input.form;
+  const fields = JSON.parse(input.dataset.wagtailModeltranslationFields);
+  // Languages the server was told were changed before the form had errors
+  const changedBefore = (input.dataset.wagtailModeltranslationChanged || '').split(',');
+  const languages = [...new Set(Object.values(fields))];
+
+  function getLanguage(name) {
+    for (const field of Object.keys(fields)) {
+      // StreamFields post one input per block, prefixed with the field name
+      if (name === field || name.startsWith(`${field}-`)) return fields[field];
+    }
+    return null;
+  }
+
+  function getValues() {
+    const values = {};
+    for (const [name, value] of new FormData(form)) {
+      const language = getLanguage(name);
+      if (language === null) continue;
+      values[language] = values[language] || [];
+      values[language].push([name, value instanceof File ? [value.name, value.size] : value]);
+    }
+    Object.keys(values).forEach(language => {
+      values[language] = JSON.stringify(values[language]);
+    });
+    return values;
+  }
+
+  // Widgets such as rich text editors rewrite their values once set up, so
+  // wait for them like Wagtail does before checking for unsaved changes. If
+  // the form is edited meanwhile, every language is cleaned.
+  let initialValues = null;
+  let edited = false;
+  const onEdit = () => { edited = initialValues === null; };
+  form.addEventListener('input', onEdit, {once: true});
+  form.addEventListener('change', onEdit, {once: true});
+  setTimeout(() => {
+    if (!edited) initialValues = getValues();
+  }, 10000);
+
+  form.addEventListener('submit', () => {
+    if (initialValues === null) {
+      input.value = languages.join(',');
+      return;
+    }
+    const values = getValues();
+    input.value = languages.filter(
+      language => changedBefore.includes(language) || values[language] !== initialValues[language]
+    ).join(',');
+  });
+});
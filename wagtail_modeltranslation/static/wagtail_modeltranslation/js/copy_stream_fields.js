@@ -24,14 +24,21 @@ $(document).ready(function(){
 		//The cycle to create the buttons for copy each language field
 		var copyContentString = 'Copy content from';
 		$(header).append('<div class="translation-field-copy-wrapper">'+copyContentString+': </div>');
+		var fieldLanguage = null;
 		for (var j = 0; j < wagtailModelTranslations.languages.length; j++) {
 			currentLangCode = wagtailModelTranslations.languages[j].replace('-', '_');
-			if (fieldLang != currentLangCode) {
+			if (fieldLang == currentLangCode) {
+				fieldLanguage = wagtailModelTranslations.languages[j];
+			} else {
 				var currentFieldID = (fieldName + '_' + fieldLang).toLowerCase().replace(' ', '_');
 				var targetFieldID = (fieldName + '_' + currentLangCode).toLowerCase().replace(' ', '_');
 				$(header).children('.translation-field-copy-wrapper')[0].innerHTML += '<button class="button translation-field-copy" current-lang-code="'+ currentFieldID +'" data-lang-code="'+ targetFieldID +'">'+wagtailModelTranslations.languages[j]+'</button>';
 			};
 		};
+		// The button to copy this field into all the other languages at once
+		if (fieldLanguage !== null) {
+			$(header).append('<div class="translation-field-copy-wrapper"><button class="button translation-field-copy-all" data-field-name="'+ fieldName +'" data-lang-code="'+ fieldLanguage +'">Copy content to all languages</button></div>');
+		};
 	};
 
 	/* on click binding */
@@ -41,6 +48,10 @@ $(document).ready(function(){
 		var currentLang = $(this).attr('current-lang-code');
 		requestCopyField(lang, currentLang);
 			});
+	$('.translation-field-copy-all').click(function(event){
+		event.preventDefault();
+		requestCopyFieldToAllLanguages($(this).attr('data-field-name'), $(this).attr('data-lang-code'));
+	});
 		});
 
 /* Get header */
@@ -59,36 +70,76 @@ function extractInputId(currentStreamField) {
 	return result.split("_");
 }
 
+/* Get the inputs of the fieldID field, selected by their name prefix rather than serializing the whole form */
+function serializeField(fieldID) {
+	return $("#page-edit-form").find("[name^='" + fieldID + "-']").serializeArray();
+}
+
 /* Copy the content of originID field to the targetID field */
 function requestCopyField(originID, targetID) {
 	/* Get the originID field and convert him to json string */
-	var serializedForm = $("#page-edit-form").serializeArray();
-	var serializedOriginField = $.grep(
-		serializedForm,
-		function(obj){
-			return obj.name.indexOf(originID) >= 0;
-		}
-	);
-	var jsonString = JSON.stringify(serializedOriginField);
+	var jsonString = JSON.stringify(serializeField(originID));
 
 	/*
-	 * AJAX request that returns the html content of originID field
-	 * with the id's changed to targetID
+	 * AJAX request that returns the block definition and the value of
+	 * originID field, to rebuild the targetID field with
 	 */
 	$.ajax({
-		url: 'copy_translation_content/',
+		url: 'copy_translation_stream_field/',
 		headers: { "X-CSRFToken": Cookies.get('csrftoken') },
 		type: 'POST',
 		dataType: 'json',
 		data: {'origin_field_name': originID, 'target_field_name': targetID, 'serializedOriginField': jsonString},
 	})
 	.done(function(data) {
-		/* Put the html data in the targetID field */
+		/* Rebuild the targetID field with the copied value */
 		var wrapperDiv = $("[name='"+targetID+"-count']").parents('.w-field__input')[0];
-		$(wrapperDiv).html(data);
+		hydrateStreamField(wrapperDiv, targetID, data);
+	})
+	.fail(function(error) {
+		console.log("wagtail-modeltranslation error: %s", error.responseText);
+	})
+
+}
+
+/* Copy the content of the fieldName field in language to all the other languages */
+function requestCopyFieldToAllLanguages(fieldName, language) {
+	var originID = fieldName + '_' + language.replace('-', '_');
+	var serializedOriginFields = {};
+	serializedOriginFields[originID] = serializeField(originID);
+
+	/*
+	 * AJAX request that returns the block definition and the value of the
+	 * originID field once, along with the target fields to copy it into
+	 */
+	$.ajax({
+		url: 'copy_translation_stream_fields/',
+		headers: { "X-CSRFToken": Cookies.get('csrftoken') },
+		type: 'POST',
+		dataType: 'json',
+		data: {'origin_language': language, 'field_names': fieldName, 'serializedOriginFields': JSON.stringify(serializedOriginFields)},
+	})
+	.done(function(data) {
+		$.each(data, function(originID, copy) {
+			$.each(copy.targets, function(index, targetID) {
+				var wrapperDiv = $("[name='"+targetID+"-count']").parents('.w-field__input')[0];
+				hydrateStreamField(wrapperDiv, targetID, copy);
+			});
+		});
 	})
 	.fail(function(error) {
 		console.log("wagtail-modeltranslation error: %s", error.responseText);
 	})
 
 }
+
+/*
+ * Replace the StreamField in wrapperDiv by a new one rendered from the block
+ * definition and value of data, the way every Wagtail version initializes
+ * StreamField widgets
+ */
+function hydrateStreamField(wrapperDiv, fieldID, data) {
+	var placeholder = $('<div>').attr('id', fieldID);
+	$(wrapperDiv).empty().append(placeholder);
+	window.telepath.unpack(data.block).render(placeholder[0], fieldID, data.value, null);
+}
@@ -112,6 +112,18 @@ function buildLocaleToggler() {
     $(`button.locale-toggle`, li).each( (index, toggle) => {
       toggle.addEventListener(`click`, e => {
         e.preventDefault();
+        if (!localisedElements[locale]) {
+          // The fields of this locale weren't rendered, fetch them first
+          if (toggle.disabled) return;
+          toggle.disabled = true;
+          fetchLocalePanels(locale).always(() => {
+            toggle.disabled = false;
+            if (!localisedElements[locale]) return;
+            toggle.classList.add(`showing-locale`);
+            toggleLocale(locale, true);
+          });
+          return;
+        }
         toggle.classList.toggle(`showing-locale`);
         toggleLocale(locale, toggle.classList.contains(`showing-locale`));
       });
@@ -134,7 +146,7 @@ function buildLocaleToggler() {
 function toggleLocale(locale, state) {
   var action = state ? `remove` : `add`;
 
-  localisedElements[locale].forEach(element => {
+  (localisedElements[locale] || []).forEach(element => {
     element.classList[action](`l10n-hidden`);
   });
 
@@ -142,9 +154,72 @@ function toggleLocale(locale, state) {
   let cur_state = JSON.parse(localStorage.getItem('initially_loaded_locale') || "{}");
   cur_state[locale] = state;
   localStorage.setItem('initially_loaded_locale', JSON.stringify(cur_state));
+
+  if (wagtailModelTranslations.locale_picker_render_selected) {
+    // the server renders the locales stored here on the next page load
+    document.cookie = `${localePickerCookie}=${encodeURIComponent(getSelectedLocales().join(','))}; path=/; max-age=31536000; SameSite=Lax`;
+  }
+}
+
+/**
+ * Gets the locales stored by the picker for the server to render.
+ */
+function getPickedLocales() {
+  var match = document.cookie.match(new RegExp(`(?:^|; )${localePickerCookie}=([^;]*)`));
+  if (match === null) return [];
+  return decodeURIComponent(match[1]).split(',').filter(
+    locale => wagtailModelTranslations.languages.indexOf(locale) > -1
+  );
+}
+
+/**
+ * Returns the panel of a field within the given element.
+ */
+function getFieldPanel(fieldName, element) {
+  var field = $(`[name="${fieldName}"], [name^="${fieldName}-"], [id="id_${fieldName}"]`, element).first();
+  var panel = field.closest(`div.w-panel__wrapper, section.w-panel`);
+  return panel.length > 0 ? panel : null;
+}
+
+/**
+ * Fetches the panels of a locale the server didn't render, and inserts each
+ * of them next to the panel of the same field in the closest rendered locale.
+ */
+function fetchLocalePanels(locale) {
+  return $.getJSON(`locale_panels/`, {language: locale}).done(data => {
+    var fetched = $(`<div></div>`).append($.parseHTML(data.html, document, true));
+    var position = wagtailModelTranslations.languages.indexOf(locale);
+
+    Object.keys(data.fields).forEach(fieldName => {
+      var panel = getFieldPanel(fieldName, fetched);
+      if (panel === null) return;
+
+      var localizedNames = data.fields[fieldName];
+      var before = null, after = null;
+      wagtailModelTranslations.languages.forEach((other, index) => {
+        if (!localisedElements[other] || !localizedNames[other]) return;
+        var otherPanel = getFieldPanel(localizedNames[other], topLevel);
+        if (otherPanel === null) return;
+        if (index < position) {
+          after = otherPanel;
+        } else if (index > position && before === null) {
+          before = otherPanel;
+        }
+      });
+
+      if (after !== null) {
+        after.after(panel);
+      } else if (before !== null) {
+        before.before(panel);
+      }
+    });
+
+    buildSets(topLevel);
+  });
 }
 
 var default_locale = wagtailModelTranslations.defaultLanguage;
+var localePickerCookie = wagtailModelTranslations.locale_picker_cookie;
 var localisedElements = {};
 var columnCSS = [`field-col`];
 for (var i=1; i<=12; i++) { columnCSS.push(`col${i}`); }
@@ -164,8 +239,13 @@ var localeToggler = buildLocaleToggler();
 
 let initially_loaded_locale = wagtailModelTranslations.locale_picker_default;
 
-// Restore enabled locale
-if(wagtailModelTranslations.locale_picker_restore){
+if (wagtailModelTranslations.locale_picker_render_selected) {
+  // Show the locales the server rendered the fields of
+  let picked = getPickedLocales();
+  if (picked.length > 0) {
+    initially_loaded_locale = picked;
+  }
+} else if(wagtailModelTranslations.locale_picker_restore){
   let stored = localStorage.getItem('initially_loaded_locale');
   if(stored !== null){
     let stored_state = JSON.parse(stored);
@@ -174,6 +254,7 @@ if(wagtailModelTranslations.locale_picker_restore){
 }
 
 for (language of initially_loaded_locale) {
+    if (!localeToggler[language]) continue;
     localeToggler[language].classList.add(`showing-locale`);
     toggleLocale(language, true);
 }
@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:58
+
+import django.db.models.deletion
+import modelcluster.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tests", "0002_titlefieldpanelpagetest"),
+        ("wagtailcore", "0062_comment_models_and_pagesubscription"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InlinePanelNoPanelsPage",
+            fields=[
+                (
+                    "page_ptr",
+                    models.OneToOneField(
+                        auto_created=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        parent_link=True,
+                        primary_key=True,
+                        serialize=False,
+                        to="wagtailcore.page",
+                    ),
+                ),
+            ],
+            options={
+                "abstract": False,
+            },
+            bases=("wagtailcore.page",),
+        ),
+        migrations.CreateModel(
+            name="PageInlineModelNoPanels",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=10)),
+                ("name_de", models.CharField(max_length=10, null=True)),
+                ("name_en", models.CharField(max_length=10, null=True)),
+                (
+                    "page",
+                    modelcluster.fields.ParentalKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_no_panels_model",
+                        to="tests.inlinepanelnopanelspage",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -216,6 +216,17 @@ class InlinePanelPage(Page):
     content_panels = [InlinePanel("related_page_model")]
 
 
+class PageInlineModelNoPanels(models.Model):
+    page = ParentalKey(
+        "tests.InlinePanelNoPanelsPage", related_name="related_no_panels_model"
+    )
+    name = models.CharField(max_length=10)
+
+
+class InlinePanelNoPanelsPage(Page):
+    content_panels = [InlinePanel("related_no_panels_model")]
+
+
 class RoutablePageTest(RoutablePageMixin, Page):
     @route(r"^archive/year/1984/$")
     def archive_for_1984(self, request):
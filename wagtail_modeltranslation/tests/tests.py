@@ -1,5 +1,8 @@
-from django.core.exceptions import ValidationError
-from django.core.management import call_command
+import json
+from io import StringIO
+
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.core.management import CommandError, call_command
 from django.http import HttpRequest
 from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
@@ -196,6 +199,427 @@ class WagtailModeltranslationTest(TestCase):
             models.PatchTestSnippetNoPanels, ["name_de", "name_en"]
         )
 
+    def test_patching_timings(self):
+        from wagtail_modeltranslation.patch_wagtailadmin import (
+            WagtailTranslator,
+            patch_wagtail_models,
+        )
+
+        self.assertIsInstance(WagtailTranslator._patched_models, set)
+        self.assertIn(models.FieldPanelPage, WagtailTranslator._patched_models)
+
+        # Models are only patched once, patching again just reports the timings
+        with self.assertLogs(
+            "wagtail_modeltranslation.patch_wagtailadmin", "DEBUG"
+        ) as logs:
+            patch_wagtail_models()
+        self.assertEqual(len(logs.records), 1)
+        self.assertRegex(logs.output[0], r"Patched \d+ models in \d+\.\d{3}s \(\)")
+        self.check_fieldpanel_patching(panels=models.FieldPanelPage.content_panels)
+
+    def test_lazy_panels_patching(self):
+        from unittest import mock
+
+        from wagtail.admin.panels import FieldPanel
+        from wagtail.admin.viewsets.model import ModelViewSet
+
+        from wagtail_modeltranslation.patch_wagtailadmin import (
+            WagtailTranslator,
+            _install_edit_handler_hooks,
+        )
+
+        # Restore the edit handler getters as they were once the test is done
+        page_get_edit_handler = mock.patch.object(
+            Page, "get_edit_handler", Page.__dict__["get_edit_handler"]
+        )
+        viewset_get_edit_handler = mock.patch.object(
+            ModelViewSet, "get_edit_handler", ModelViewSet.get_edit_handler
+        )
+        page_get_edit_handler.start()
+        self.addCleanup(page_get_edit_handler.stop)
+        viewset_get_edit_handler.start()
+        self.addCleanup(viewset_get_edit_handler.stop)
+
+        _install_edit_handler_hooks()
+        # Installing the hooks twice doesn't wrap the edit handler getters again
+        _install_edit_handler_hooks()
+
+        # Simulate a page type left unpatched by WAGTAILMODELTRANSLATION_LAZY_PANELS
+        patched_panels = models.FieldPanelPage.content_panels
+        models.FieldPanelPage.content_panels = [FieldPanel("name")]
+        name_de = models.FieldPanelPage._meta.get_field("name_de")
+        name_de.blank = True
+        try:
+            # The fields of its panels are patched without building the panels
+            WagtailTranslator(models.FieldPanelPage)._patch_panel_fields(
+                models.FieldPanelPage
+            )
+            self.assertFalse(name_de.blank)
+            self.assertEqual(len(models.FieldPanelPage.content_panels), 1)
+
+            WagtailTranslator._lazy_panel_models.add(models.FieldPanelPage)
+            models.FieldPanelPage.get_edit_handler.cache_clear()
+            form = models.FieldPanelPage.get_edit_handler().get_form_class()
+
+            self.check_fieldpanel_patching(panels=models.FieldPanelPage.content_panels)
+            self.assertIn("name_de", form.base_fields)
+            self.assertIn("name_en", form.base_fields)
+            self.assertNotIn(
+                models.FieldPanelPage, WagtailTranslator._lazy_panel_models
+            )
+        finally:
+            name_de.blank = False
+            models.FieldPanelPage.content_panels = patched_panels
+            models.FieldPanelPage.get_edit_handler.cache_clear()
+
+    def test_lazy_inline_panels_without_panels(self):
+        from unittest import mock
+
+        from wagtail.admin.panels import InlinePanel
+        from wagtail.admin.viewsets.model import ModelViewSet
+
+        from wagtail_modeltranslation.patch_wagtailadmin import (
+            WagtailTranslator,
+            _install_edit_handler_hooks,
+        )
+
+        page_get_edit_handler = mock.patch.object(
+            Page, "get_edit_handler", Page.__dict__["get_edit_handler"]
+        )
+        viewset_get_edit_handler = mock.patch.object(
+            ModelViewSet, "get_edit_handler", ModelViewSet.get_edit_handler
+        )
+        page_get_edit_handler.start()
+        self.addCleanup(page_get_edit_handler.stop)
+        viewset_get_edit_handler.start()
+        self.addCleanup(viewset_get_edit_handler.stop)
+        _install_edit_handler_hooks()
+
+        page_model = models.InlinePanelNoPanelsPage
+        inline_model = models.PageInlineModelNoPanels
+        # The panels the eager patching extracted from the inline model fields
+        patched_content_panels = page_model.content_panels
+        patched_inline_panels = inline_model.panels
+        eager_fields = [panel.field_name for panel in patched_inline_panels]
+        self.assertIn("name_de", eager_fields)
+        self.assertIn("name_en", eager_fields)
+        self.assertNotIn("name", eager_fields)
+
+        # Simulate a page type left unpatched by WAGTAILMODELTRANSLATION_LAZY_PANELS
+        page_model.content_panels = [InlinePanel("related_no_panels_model")]
+        del inline_model.panels
+        blank = {
+            field.name: field.blank
+            for field in inline_model._meta.get_fields()
+            if hasattr(field, "blank")
+        }
+        try:
+            translator = WagtailTranslator(page_model)
+            with mock.patch.object(
+                translator,
+                "_patch_panels_fields",
+                wraps=translator._patch_panels_fields,
+            ) as patch_panels_fields:
+                translator._patch_panel_fields(page_model)
+            # The inline model panels are extracted the same way in both modes
+            self.assertEqual(
+                [
+                    [panel.field_name for panel in call.args[0]]
+                    for call in patch_panels_fields.call_args_list
+                    if inline_model in call.args
+                ],
+                [eager_fields],
+            )
+            self.assertFalse(hasattr(inline_model, "panels"))
+            self.assertEqual(
+                {
+                    field.name: field.blank
+                    for field in inline_model._meta.get_fields()
+                    if hasattr(field, "blank")
+                },
+                blank,
+            )
+
+            WagtailTranslator._lazy_panel_models.add(page_model)
+            page_model.get_edit_handler.cache_clear()
+            page_model.get_edit_handler().get_form_class()
+            self.assertEqual(
+                [panel.field_name for panel in inline_model.panels], eager_fields
+            )
+        finally:
+            WagtailTranslator._lazy_panel_models.discard(page_model)
+            page_model.content_panels = patched_content_panels
+            inline_model.panels = patched_inline_panels
+            page_model.get_edit_handler.cache_clear()
+
+    def test_edit_handler_form_class_memoized(self):
+        """
+        Assert the edit handlers of translated models build their form class
+        once, for as long as Wagtail caches them
+        """
+        edit_handler = models.FieldPanelPage.get_edit_handler()
+        form_class = edit_handler.get_form_class()
+        self.assertIs(edit_handler.get_form_class(), form_class)
+        self.assertIn("name_en", form_class.base_fields)
+
+        models.FieldPanelPage.get_edit_handler.cache_clear()
+        self.assertIsNot(
+            models.FieldPanelPage.get_edit_handler().get_form_class(), form_class
+        )
+
+        snippet_edit_handler = models.FieldPanelSnippet.snippet_viewset._edit_handler
+        self.assertIs(
+            snippet_edit_handler.get_form_class(),
+            snippet_edit_handler.get_form_class(),
+        )
+
+    def test_render_selected_locales(self):
+        """
+        Assert page editors only render the translation fields of the picked
+        languages, save the posted languages only and fetch the others
+        """
+        from unittest import mock
+
+        from django.contrib.auth import get_user_model
+
+        from wagtail_modeltranslation import wagtail_hooks
+        from wagtail_modeltranslation.patch_wagtailadmin import (
+            _render_selected_languages,
+        )
+        from wagtail_modeltranslation.patch_wagtailadmin_forms import (
+            LOCALE_PICKER_COOKIE,
+        )
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root picker", "slug_de": "root-picker"},
+            "children": {
+                "child": {
+                    "model": models.FieldPanelPage,
+                    "kwargs": {
+                        "title_de": "Seite",
+                        "title_en": "Page",
+                        "slug_de": "seite",
+                        "slug_en": "page",
+                        "name_de": "Name",
+                        "name_en": "Name EN",
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        page = site_pages["children"]["child"]["instance"]
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        edit_handler = _render_selected_languages(
+            models.FieldPanelPage.get_edit_handler()
+        )
+        form_class = edit_handler.get_form_class()
+
+        try:
+            request = request_factory.get("/")
+            request.user = user
+            request.COOKIES[LOCALE_PICKER_COOKIE] = "de"
+            form = form_class(
+                instance=page, parent_page=page.get_parent(), for_user=user
+            )
+            edit_handler.get_bound_panel(instance=page, request=request, form=form)
+            self.assertIn("name_de", form.fields)
+            self.assertNotIn("name_en", form.fields)
+            self.assertIn("slug_de", form.fields)
+            self.assertNotIn("slug_en", form.fields)
+
+            data = {"title_de": "Seite neu", "slug_de": "seite", "name_de": "Neu"}
+            with mock.patch.object(
+                wagtail_hooks.wmt_settings, "LOCALE_PICKER_RENDER_SELECTED", True
+            ):
+                form = form_class(
+                    data, instance=page, parent_page=page.get_parent(), for_user=user
+                )
+            self.assertNotIn("name_en", form.fields)
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+            page = models.FieldPanelPage.objects.get(id=page.id)
+            self.assertEqual(page.name_de, "Neu")
+            self.assertEqual(page.name_en, "Name EN")
+            self.assertEqual(page.slug_en, "page")
+
+            # The panels of the other languages are fetched on demand
+            request = request_factory.get("/", {"language": "en"})
+            request.user = user
+            with mock.patch(
+                "wagtail.admin.panels.Panel.BoundPanel.render_form_content",
+                return_value="<panels>",
+            ):
+                response = wagtail_hooks.return_locale_panels(request, page.id)
+            data = json.loads(response.content)
+            self.assertEqual(data["html"], "<panels>")
+            self.assertEqual(
+                data["fields"]["name_en"], {"de": "name_de", "en": "name_en"}
+            )
+            self.assertIn("slug_en", data["fields"])
+            self.assertNotIn("name_de", data["fields"])
+        finally:
+            models.FieldPanelPage.get_edit_handler.cache_clear()
+
+    def test_save_changed_languages(self):
+        """
+        Assert page forms only clean and save the translation fields of the
+        languages the editor posted as changed, and still render the others
+        """
+        from unittest import mock
+
+        from django.contrib.auth import get_user_model
+
+        from wagtail_modeltranslation import settings as wmt_settings
+        from wagtail_modeltranslation.patch_wagtailadmin_forms import (
+            CHANGED_LANGUAGES_FIELD,
+        )
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root changed", "slug_de": "root-changed"},
+            "children": {
+                "child": {
+                    "model": models.StreamFieldPanelPage,
+                    "kwargs": {
+                        "title_de": "Seite",
+                        "slug_de": "seite",
+                        "body_de": [("text", "de")],
+                        "body_en": [("text", "much too long")],
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        page = site_pages["children"]["child"]["instance"]
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        form_class = models.StreamFieldPanelPage.get_edit_handler().get_form_class()
+
+        def get_data(page, changed=None, **texts):
+            data = {"title_de": page.title_de, "slug_de": page.slug_de}
+            for language in ("de", "en"):
+                block = getattr(page, "body_%s" % language)[0]
+                data.update(
+                    {
+                        "body_%s-count" % language: "1",
+                        "body_%s-0-type" % language: "text",
+                        "body_%s-0-value" % language: texts.get(language, block.value),
+                        "body_%s-0-id" % language: block.id,
+                        "body_%s-0-deleted" % language: "",
+                        "body_%s-0-order" % language: "0",
+                    }
+                )
+            if changed is not None:
+                data[CHANGED_LANGUAGES_FIELD] = ",".join(changed)
+            return data
+
+        def get_form(page, changed=None, **texts):
+            return form_class(
+                get_data(page, changed, **texts),
+                instance=page,
+                parent_page=page.get_parent(),
+                for_user=user,
+            )
+
+        form = get_form(page, de="neu")
+        self.assertFalse(form.is_valid())
+        self.assertIn("body_en", form.errors)
+        self.assertNotIn(CHANGED_LANGUAGES_FIELD, form.fields)
+
+        with mock.patch.object(wmt_settings, "SAVE_CHANGED_LANGUAGES", True):
+            # The editor is told the language of each translation field
+            form = form_class(instance=page, parent_page=page.get_parent())
+            widget = form.fields[CHANGED_LANGUAGES_FIELD].widget
+            fields = json.loads(widget.attrs["data-wagtail-modeltranslation-fields"])
+            self.assertEqual(fields["body_de"], "de")
+            self.assertEqual(fields["body_en"], "en")
+            self.assertNotIn(CHANGED_LANGUAGES_FIELD, fields)
+            request = request_factory.get("/")
+            request.user = user
+            html = (
+                models.StreamFieldPanelPage.get_edit_handler()
+                .get_bound_panel(instance=page, request=request, form=form)
+                .render_missing_fields()
+            )
+            self.assertIn('name="%s"' % CHANGED_LANGUAGES_FIELD, html)
+
+            # Every language is cleaned unless the editor tells which changed
+            form = get_form(page, de="neu")
+            self.assertFalse(form.is_valid())
+            self.assertIn("body_en", form.errors)
+
+            # The untouched "en" body is neither deserialized, cleaned nor saved
+            form = get_form(page, ["de"], de="neu", en="ignored")
+            untouched = AssertionError("The untouched language was cleaned")
+            with mock.patch.object(
+                form.fields["body_en"].widget,
+                "value_from_datadict",
+                side_effect=untouched,
+            ), mock.patch.object(
+                form.fields["body_en"], "clean", side_effect=untouched
+            ):
+                self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+            page = models.StreamFieldPanelPage.objects.get(id=page.id)
+            self.assertEqual(page.body_de[0].value, "neu")
+            self.assertEqual(page.body_en[0].value, "much too long")
+
+            # A failed save renders every language again, along with the
+            # languages to save when it is resubmitted
+            form = get_form(page, ["de", "en"], de="also much too long", en="new")
+            self.assertFalse(form.is_valid())
+            self.assertIn("body_de", form.errors)
+            self.assertIn("body_en", form.fields)
+            self.assertEqual(form["body_en"].value()[0].value, "new")
+            self.assertEqual(
+                form.fields[CHANGED_LANGUAGES_FIELD].widget.attrs[
+                    "data-wagtail-modeltranslation-changed"
+                ],
+                "de,en",
+            )
+            form = get_form(page, ["de", "en"], de="neuer", en="new")
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+        page = models.StreamFieldPanelPage.objects.get(id=page.id)
+        self.assertEqual(page.body_de[0].value, "neuer")
+        self.assertEqual(page.body_en[0].value, "new")
+
+    def test_patch_admin_disabled(self):
+        from unittest import mock
+
+        from wagtail import hooks
+        from wagtail.admin.panels import FieldPanel
+
+        from wagtail_modeltranslation import patch_wagtailadmin, wagtail_hooks
+        from wagtail_modeltranslation.patch_wagtailadmin import WagtailTranslator
+
+        def admin_hook():
+            pass
+
+        # Simulate a snippet loaded with WAGTAILMODELTRANSLATION_PATCH_ADMIN disabled
+        patched_panels = models.FieldPanelSnippet.panels
+        models.FieldPanelSnippet.panels = [FieldPanel("name")]
+        WagtailTranslator._patched_models.discard(models.FieldPanelSnippet)
+        try:
+            with mock.patch.object(patch_wagtailadmin, "PATCH_ADMIN", False):
+                WagtailTranslator(models.FieldPanelSnippet)
+            with mock.patch.object(wagtail_hooks.wmt_settings, "PATCH_ADMIN", False):
+                wagtail_hooks.register_admin_hook("insert_editor_js", admin_hook)
+                decorated = wagtail_hooks.register_admin_hook("insert_editor_js")(
+                    admin_hook
+                )
+
+            self.assertEqual(len(models.FieldPanelSnippet.panels), 1)
+            self.assertIs(decorated, admin_hook)
+            self.assertNotIn(admin_hook, hooks.get_hooks("insert_editor_js"))
+        finally:
+            models.FieldPanelSnippet.panels = patched_panels
+            WagtailTranslator._patched_models.add(models.FieldPanelSnippet)
+
     def check_panels_patching(self, model, model_fields):
         patched_edit_handler = get_edit_handler(model)
 
@@ -464,6 +888,89 @@ class WagtailModeltranslationTest(TestCase):
         for field in expected_fields:
             self.assertIn(field, model_search_fields)
 
+        # Each translated field is added once, and the clones of the inherited
+        # Page search fields are shared with Page
+        self.assertEqual(model_search_fields.count("title_en"), 1)
+        page_title_en = [
+            field for field in Page.search_fields if field.field_name == "title_en"
+        ]
+        self.assertEqual(len(page_title_en), 1)
+        self.assertIn(page_title_en[0], models.PatchTestPage.search_fields)
+
+    @override_settings(
+        WAGTAILSEARCH_BACKENDS={
+            "default": {"BACKEND": "wagtail.search.backends.database"},
+            "en": {
+                "BACKEND": "wagtail_modeltranslation.search",
+                "LOCALIZED_BACKEND": "wagtail.search.backends.base.BaseSearchBackend",
+                "LANGUAGE": "en",
+            },
+        }
+    )
+    def test_localized_search_backend(self):
+        from unittest import mock
+
+        from wagtail.search import index
+        from wagtail.search.backends import get_search_backend
+        from wagtail.search.backends.base import NullIndex
+
+        from wagtail_modeltranslation.search import get_search_backend_name
+
+        self.assertEqual(get_search_backend_name("en"), "en")
+        self.assertEqual(get_search_backend_name("de"), "default")
+
+        page = models.PatchTestPage(title_de="Titel", title_en="Title")
+        indexed_titles = []
+
+        def add_item(index, item):
+            indexed_titles.append(item.title)
+
+        with mock.patch.object(NullIndex, "add_item", add_item):
+            with translation.override("de"):
+                get_search_backend("en").add(page)
+
+        self.assertEqual(indexed_titles, ["Title"])
+
+        # Saved pages are only indexed again when their English values change,
+        # given the search fields aren't cloned per language
+        page.id = page.pk = 1000
+        search_fields = [index.SearchField("title")]
+        backend = get_search_backend("en")
+        with mock.patch.object(NullIndex, "add_item", add_item), mock.patch.object(
+            models.PatchTestPage, "search_fields", search_fields
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                backend.add(page)
+            backend.add(page)
+            page.title_de = "Neuer Titel"
+            backend.add(page)
+            page.title_en = "New title"
+            with self.captureOnCommitCallbacks(execute=True):
+                backend.add(page)
+            self.assertEqual(indexed_titles, ["Title", "Title", "New title"])
+
+            # Fingerprints are only kept once the transaction commits
+            page.title_en = "Rolled back title"
+            with self.captureOnCommitCallbacks(execute=False):
+                backend.add(page)
+            backend.add(page)
+            self.assertEqual(indexed_titles[3:], ["Rolled back title"] * 2)
+
+            # Deleted, bulk added and reset items are indexed again
+            del indexed_titles[:]
+            page.title_en = "New title"
+            localized_index = backend.get_index_for_model(models.PatchTestPage)
+            for forget in (
+                lambda: backend.delete(page),
+                lambda: backend.add_bulk(models.PatchTestPage, [page]),
+                localized_index.invalidate_fingerprints,
+            ):
+                forget()
+                with self.captureOnCommitCallbacks(execute=True):
+                    backend.add(page)
+                backend.add(page)
+            self.assertEqual(indexed_titles, ["New title"] * 3)
+
     def test_streamfield_fallback(self):
         body_text = '[{"value": "Some text", "type": "text"}]'
         page = models.StreamFieldPanelPage(
@@ -485,6 +992,89 @@ class WagtailModeltranslationTest(TestCase):
             "page.body did not fallback to original language.",
         )
 
+    def test_streamfield_fallback_without_converting_blocks(self):
+        """
+        Assert the fallback of a StreamField tells empty streams apart from
+        their raw data, without converting any block to python
+        """
+        from unittest import mock
+
+        from wagtail.blocks import StreamBlock
+
+        page = models.StreamFieldPanelPage(
+            title_de="Streamfield raw fallback",
+            slug_de="streamfield_raw_fallback",
+            depth=1,
+            path="0008",
+            body_de='[{"value": "Text", "type": "text"}]',
+            body_en="[]",
+        )
+        page.save()
+        page = models.StreamFieldPanelPage.objects.get(pk=page.pk)
+
+        descriptor = models.StreamFieldPanelPage.body
+        for raw_value in (None, "", " [] ", "null"):
+            self.assertFalse(descriptor.meaningful_value(raw_value, None))
+
+        with translation.override("en"), mock.patch.object(
+            StreamBlock, "bulk_to_python", side_effect=AssertionError
+        ), mock.patch(
+            "wagtail.blocks.CharBlock.bulk_to_python", side_effect=AssertionError
+        ):
+            body = page.body
+        self.assertIs(body, page.body_de)
+        self.assertEqual(str(body), '<div class="block-text">Text</div>')
+
+    def test_defer_translations(self):
+        """
+        Assert defer_translations defers the translation fields of the
+        languages neither the active one nor its fallbacks read
+        """
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root defer", "slug_de": "root-defer"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {
+                        "title_de": "Seite",
+                        "title_en": "Page",
+                        "slug_de": "seite",
+                        "slug_en": "page",
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        child = site_pages["children"]["child"]["instance"]
+
+        english_fields = {
+            "search_description_en",
+            "seo_title_en",
+            "slug_en",
+            "title_en",
+            "url_path_en",
+        }
+        with translation.override("de"):
+            page = models.TestSlugPage1.objects.defer_translations().get(id=child.id)
+            self.assertEqual(page.get_deferred_fields(), english_fields)
+            with self.assertNumQueries(0):
+                self.assertEqual(page.title, "Seite")
+            page.seo_title_de = "Seite SEO"
+            page.save()
+        self.assertEqual(Page.objects.rewrite(False).get(id=child.id).title_en, "Page")
+
+        # The fallback languages of the active language are kept
+        with translation.override("en"):
+            self.assertEqual(
+                Page.objects.all().defer_translations().query.deferred_loading[0],
+                set(),
+            )
+            self.assertEqual(
+                Page.objects.defer_translations("de").query.deferred_loading[0],
+                english_fields,
+            )
+
     @override_settings(LANGUAGE_CODE="de")
     def test_set_url_path(self):
         """
@@ -985,6 +1575,157 @@ class WagtailModeltranslationTest(TestCase):
         wagtail_page_01_new = site_root_page.get_children().get(id=wagtail_page_01.id)
         self.assertEqual(wagtail_page_01_new.url, "/de/url-de-01/")
 
+    @override_settings(LANGUAGE_CODE="de")
+    def test_rich_text_page_links(self):
+        from wagtail.rich_text import expand_db_html
+
+        from wagtail_modeltranslation.rich_text import (
+            clear_page_url_memo,
+            invalidate_page_url_cache,
+            start_page_url_memo,
+        )
+
+        invalidate_page_url_cache()
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title": "root rich text"},
+            "children": {
+                "child1": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {
+                        "title": "child1 rich text",
+                        "slug_de": "rich-text-de-01",
+                        "slug_en": "rich-text-en-01",
+                    },
+                },
+                "child2": {
+                    "model": models.TestSlugPage2,
+                    "kwargs": {"title": "child2 rich text", "slug": "rich-text-de-02"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        page_01 = site_pages["children"]["child1"]["instance"]
+        page_02 = site_pages["children"]["child2"]["instance"]
+
+        html = "".join(
+            '<a linktype="page" id="{}">link</a>'.format(page.id)
+            for page in [page_01, page_02, page_01]
+        )
+        html += '<a linktype="page" id="999999">missing</a>'
+
+        # Every link is resolved at once, with a query per page type and one for
+        # the site root paths
+        with self.assertNumQueries(4):
+            self.assertEqual(
+                expand_db_html(html),
+                '<a href="/de/rich-text-de-01/">link</a>'
+                '<a href="/de/rich-text-de-02/">link</a>'
+                '<a href="/de/rich-text-de-01/">link</a>'
+                "<a>missing</a>",
+            )
+
+        start_page_url_memo()
+        try:
+            with translation.override("en"):
+                self.assertEqual(
+                    expand_db_html(html),
+                    '<a href="/en/rich-text-en-01/">link</a>'
+                    '<a href="/en/rich-text-de-02/">link</a>'
+                    '<a href="/en/rich-text-en-01/">link</a>'
+                    "<a>missing</a>",
+                )
+                # Nothing has to be looked up again, not even the missing page
+                with self.assertNumQueries(0):
+                    expand_db_html(html)
+        finally:
+            clear_page_url_memo()
+
+    @override_settings(LANGUAGE_CODE="de")
+    def test_rich_text_page_links_cache(self):
+        from wagtail.rich_text import expand_db_html
+
+        from wagtail_modeltranslation.rich_text import (
+            clear_page_url_memo,
+            invalidate_page_url_cache,
+            start_page_url_memo,
+        )
+
+        invalidate_page_url_cache()
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title": "root link cache"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {
+                        "title": "child link cache",
+                        "slug_de": "link-cache-de",
+                        "slug_en": "link-cache-en",
+                    },
+                    "children": {
+                        "grandchild": {
+                            "model": models.TestSlugPage1,
+                            "kwargs": {"title": "grandchild link cache"},
+                        },
+                    },
+                },
+                "other": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title": "other link cache"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        child = site_pages["children"]["child"]["instance"]
+        grandchild = site_pages["children"]["child"]["children"]["grandchild"][
+            "instance"
+        ]
+        other = site_pages["children"]["other"]["instance"]
+        html = '<a linktype="page" id="{}">link</a>'.format(grandchild.id)
+        other_html = '<a linktype="page" id="{}">link</a>'.format(other.id)
+        expand_db_html(other_html)
+
+        self.assertEqual(
+            expand_db_html(html),
+            '<a href="/de/link-cache-de/grandchild-link-cache/">link</a>',
+        )
+        # Urls are now served from the cache
+        with self.assertNumQueries(0):
+            expand_db_html(html)
+
+        # Changing the slug of an ancestor in any language invalidates the cache
+        child = models.TestSlugPage1.objects.get(id=child.id)
+        child.slug_de = "link-cache-new-de"
+        child.save()
+        self.assertEqual(
+            expand_db_html(html),
+            '<a href="/de/link-cache-new-de/grandchild-link-cache/">link</a>',
+        )
+        # The urls cached out of the changed subtree are kept
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                expand_db_html(other_html), '<a href="/de/other-link-cache/">link</a>'
+            )
+
+        with translation.override("en"):
+            self.assertEqual(
+                expand_db_html(html),
+                '<a href="/en/link-cache-en/grandchild-link-cache/">link</a>',
+            )
+
+        # Urls built for the site of a request are cached apart from the others
+        environ = request_factory.get("/").environ
+        for queries in (3, 1):
+            start_page_url_memo(environ=environ)
+            try:
+                with self.assertNumQueries(queries):
+                    expand_db_html(html)
+            finally:
+                clear_page_url_memo()
+
     def test_set_translation_url_paths_command(self):
         """
         Assert set_translation_url_paths management command works correctly
@@ -1123,6 +1864,386 @@ class WagtailModeltranslationTest(TestCase):
             "/root-untranslated/child2-translated-en/grandchild1-translated-en/grandgrandchild1-translated-en/",
         )
 
+        # Url paths are now up to date, a second run has nothing to write
+        out = StringIO()
+        call_command("set_translation_url_paths", stdout=out)
+        self.assertEqual(out.getvalue(), "0 pages updated\n")
+
+    def test_set_translation_url_paths_command_options(self):
+        """
+        Assert set_translation_url_paths can be scoped, dry-run and resumed
+        """
+        import json
+        import os
+        import tempfile
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title": "root options"},
+            "children": {
+                "child1": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title": "child1 options", "slug_en": "child1-en"},
+                    "children": {
+                        "grandchild": {
+                            "model": models.TestSlugPage1,
+                            "kwargs": {"title": "grandchild options"},
+                        },
+                    },
+                },
+                "child2": {
+                    "model": models.TestSlugPage2,
+                    "kwargs": {"title": "child2 options"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        child1 = site_pages["children"]["child1"]["instance"]
+        grandchild = site_pages["children"]["child1"]["children"]["grandchild"][
+            "instance"
+        ]
+        child2 = site_pages["children"]["child2"]["instance"]
+
+        def corrupt():
+            Page.objects.filter(id__in=[child1.id, grandchild.id, child2.id]).rewrite(
+                False
+            ).update(
+                url_path="/corrupted/", url_path_de="/corrupted/", url_path_en=None
+            )
+
+        def url_paths(page):
+            return tuple(
+                Page.objects.filter(id=page.id)
+                .rewrite(False)
+                .values_list("url_path_de", "url_path_en")
+                .get()
+            )
+
+        corrupt()
+        out = StringIO()
+        call_command("set_translation_url_paths", dry_run=True, stdout=out)
+        self.assertEqual(
+            out.getvalue(),
+            "url_path: 3 paths would change\n"
+            "url_path_de: 3 paths would change\n"
+            "url_path_en: 3 paths would change\n"
+            "3 pages would be updated\n",
+        )
+        self.assertEqual(url_paths(grandchild), ("/corrupted/", None))
+
+        # Only the subtree of child1 is updated
+        call_command("set_translation_url_paths", root=child1.id, verbosity=0)
+        self.assertEqual(
+            url_paths(grandchild),
+            (
+                "/root-options/child1-options/grandchild-options/",
+                "/root-options/child1-en/grandchild-options/",
+            ),
+        )
+        self.assertEqual(url_paths(child2), ("/corrupted/", None))
+
+        # Only the english url paths are updated
+        corrupt()
+        call_command("set_translation_url_paths", languages=["en"], verbosity=0)
+        self.assertEqual(
+            url_paths(grandchild),
+            ("/corrupted/", "/root-options/child1-en/grandchild-options/"),
+        )
+
+        # Resuming from a checkpoint skips the levels already done
+        corrupt()
+        checkpoint = os.path.join(tempfile.mkdtemp(), "checkpoint.json")
+        with open(checkpoint, "w") as checkpoint_file:
+            json.dump(
+                {"root": None, "languages": ["de", "en"], "depth": 4}, checkpoint_file
+            )
+        call_command("set_translation_url_paths", checkpoint=checkpoint, verbosity=0)
+        self.assertFalse(os.path.exists(checkpoint))
+        self.assertEqual(url_paths(child1), ("/corrupted/", None))
+        self.assertEqual(
+            url_paths(grandchild),
+            ("/corrupted/grandchild-options/", "/corrupted/grandchild-options/"),
+        )
+
+        # Subtrees handed to --workers processes are updated from the url paths
+        # their parent got in the main process
+        from wagtail_modeltranslation.management.commands.set_translation_url_paths import (
+            _update_subtree,
+        )
+
+        options = {
+            "batch_size": 1000,
+            "dry_run": False,
+            "verbosity": 0,
+            "languages": None,
+            "root": grandchild.id,
+        }
+        changed_count, changed_paths = _update_subtree(
+            options, child1.path, ("/de-parent/", "/en-parent/")
+        )
+        self.assertEqual(changed_count, 1)
+        self.assertEqual(changed_paths["url_path_en"], 1)
+        self.assertEqual(
+            url_paths(grandchild),
+            ("/de-parent/grandchild-options/", "/en-parent/grandchild-options/"),
+        )
+
+    def test_set_translation_url_paths_workers(self):
+        """
+        Assert set_translation_url_paths --workers walks down the tree until
+        there are enough subtrees for the workers
+        """
+        from concurrent.futures import Future
+        from unittest import mock
+
+        from wagtail_modeltranslation.management.commands import (
+            set_translation_url_paths,
+        )
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title": "root workers"},
+            "children": {
+                "child1": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title": "child1 workers", "slug_en": "child1-en"},
+                    "children": {
+                        "grandchild": {
+                            "model": models.TestSlugPage1,
+                            "kwargs": {"title": "grandchild workers"},
+                        },
+                    },
+                },
+                "child2": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title": "child2 workers"},
+                },
+                "child3": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title": "child3 workers"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        children = [
+            site_pages["children"][name]["instance"]
+            for name in ("child1", "child2", "child3")
+        ]
+        grandchild = site_pages["children"]["child1"]["children"]["grandchild"][
+            "instance"
+        ]
+        Page.objects.filter(
+            id__in=[page.id for page in children + [grandchild]]
+        ).rewrite(False).update(
+            url_path="/corrupted/", url_path_de="/corrupted/", url_path_en=None
+        )
+
+        submitted_roots = []
+
+        class InlineExecutor(object):
+            """Runs the submitted subtrees in this process, within the test."""
+
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def submit(self, fn, options, *args):
+                submitted_roots.append(options["root"])
+                future = Future()
+                future.set_result(fn(options, *args))
+                return future
+
+        out = StringIO()
+        with mock.patch.object(
+            set_translation_url_paths, "ProcessPoolExecutor", InlineExecutor
+        ):
+            call_command("set_translation_url_paths", workers=3, stdout=out)
+
+        # The site roots are too few, the pages below them are handed out
+        self.assertEqual(sorted(submitted_roots), sorted(page.id for page in children))
+        self.assertIn("4 pages updated", out.getvalue())
+        self.assertEqual(
+            Page.objects.filter(id=grandchild.id)
+            .rewrite(False)
+            .values_list("url_path_de", "url_path_en")
+            .get(),
+            (
+                "/root-workers/child1-workers/grandchild-workers/",
+                "/root-workers/child1-en/grandchild-workers/",
+            ),
+        )
+
+    def test_sync_page_translation_fields_backfill(self):
+        """
+        Assert the columns of a new language are backfilled from the default language
+        """
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root backfill", "slug_de": "root-backfill"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {
+                        "title_de": "child backfill",
+                        "slug_de": "child-backfill",
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        root = site_pages["instance"]
+        child = site_pages["children"]["child"]["instance"]
+
+        # Pretend the columns of "en" have just been added, the untranslated
+        # columns are only used where the default language ones are empty
+        Page.objects.filter(id__in=[root.id, child.id]).rewrite(False).update(
+            title="untranslated", title_en=None, slug_en=None, url_path_en=None
+        )
+
+        out = StringIO()
+        call_command(
+            "sync_page_translation_fields",
+            backfill=["en"],
+            batch_size=1,
+            interactive=False,
+            stdout=out,
+        )
+
+        # The tree root created by the page factory has no "en" values either
+        self.assertIn(
+            "Backfilled title_en, slug_en, url_path_en in 3 pages\n",
+            out.getvalue(),
+        )
+        self.assertEqual(
+            list(
+                Page.objects.filter(id__in=[root.id, child.id])
+                .rewrite(False)
+                .order_by("path")
+                .values_list("title_en", "slug_en", "url_path_en")
+            ),
+            [
+                ("root backfill", "root-backfill", "/root-backfill/"),
+                ("child backfill", "child-backfill", "/root-backfill/child-backfill/"),
+            ],
+        )
+
+    def test_update_translation_fields_command(self):
+        """
+        Assert update_translation_fields fills in the empty default language
+        fields of pages and snippets one primary key range at a time
+        """
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root update", "slug_de": "root-update"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title_de": "child update", "slug_de": "child-update"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        root = site_pages["instance"]
+        child = site_pages["children"]["child"]["instance"]
+        snippet = models.FieldPanelSnippet.objects.create(name_de="snippet")
+
+        Page.objects.filter(id=root.id).rewrite(False).update(title_de="")
+        Page.objects.filter(id=child.id).rewrite(False).update(
+            title_de=None, seo_title_de=None
+        )
+        models.FieldPanelSnippet.objects.rewrite(False).update(name_de=None)
+
+        out = StringIO()
+        call_command(
+            "update_translation_fields",
+            "wagtailcore",
+            batch_size=1,
+            verbosity=2,
+            stdout=out,
+        )
+        # One update per page id, the tree root has empty fields as well
+        self.assertIn(
+            "3/3 ranges done, 3 rows of model 'wagtailcore.Page' updated\n",
+            out.getvalue(),
+        )
+        self.assertEqual(
+            list(
+                Page.objects.filter(id__in=[root.id, child.id])
+                .rewrite(False)
+                .order_by("path")
+                .values_list("title_de", "seo_title_de")
+            ),
+            [("root update", ""), ("child update", "")],
+        )
+        self.assertIsNone(
+            models.FieldPanelSnippet.objects.rewrite(False)
+            .values_list("name_de", flat=True)
+            .get(pk=snippet.pk)
+        )
+
+        # The fields inherited from Page are updated for the app's pages
+        Page.objects.filter(id__in=[root.id, child.id]).rewrite(False).update(
+            title_de=None
+        )
+        call_command("update_translation_fields", "tests", verbosity=0)
+        self.assertEqual(
+            models.FieldPanelSnippet.objects.rewrite(False)
+            .values_list("name_de", flat=True)
+            .get(pk=snippet.pk),
+            "snippet",
+        )
+        self.assertEqual(
+            list(
+                Page.objects.filter(id__in=[root.id, child.id])
+                .rewrite(False)
+                .order_by("path")
+                .values_list("title_de", flat=True)
+            ),
+            ["root update", "child update"],
+        )
+
+    def test_makemigrations_translation_command(self):
+        """
+        Assert makemigrations_translation hides the translation fields of Page
+        """
+        out = StringIO()
+        call_command(
+            "makemigrations_translation",
+            "wagtailcore",
+            dry_run=True,
+            verbosity=2,
+            stdout=out,
+        )
+        self.assertIn("No changes detected in app 'wagtailcore'", out.getvalue())
+        self.assertRegex(
+            out.getvalue(), r"Page state replaced in \d+\.\d{3}s, migrations made in"
+        )
+
+    def test_migrate_translation_command(self):
+        """
+        Assert migrate_translation hides Page changes and skips the sync when
+        every Page translation column exists
+        """
+        from wagtail_modeltranslation.management.commands.sync_page_translation_fields import (
+            Command as SyncPageTranslationFieldsCommand,
+        )
+
+        out = StringIO()
+        call_command("migrate_translation", stdout=out)
+        self.assertIn("No migrations to apply.", out.getvalue())
+        self.assertNotIn("Your models in app(s)", out.getvalue())
+        self.assertTrue(
+            out.getvalue().endswith("No new translatable fields detected\n")
+        )
+        self.assertEqual(
+            SyncPageTranslationFieldsCommand().get_missing_page_columns(), {}
+        )
+
     def test_apply_if_live(self):
         root = models.TitleFieldPanelPageTest(
             title="title",
@@ -1137,3 +2258,315 @@ class WagtailModeltranslationTest(TestCase):
         title_field = root.content_panels[0]
 
         self.assertEqual(title_field.apply_if_live, True)
+
+    def test_copy_translation_stream_field(self):
+        from django.contrib.auth import get_user_model
+
+        from wagtail_modeltranslation.wagtail_hooks import copy_translation_stream_field
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root copy", "slug_de": "root-copy"},
+            "children": {
+                "child": {
+                    "model": models.StreamFieldPanelPage,
+                    "kwargs": {
+                        "title_de": "child copy",
+                        "slug_de": "child-copy",
+                        "body_de": '[{"value": "Hallo", "type": "text"}]',
+                        "body_en": '[{"value": "Hello", "type": "text"}]',
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        page = site_pages["children"]["child"]["instance"]
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        request_factory = RequestFactory()
+
+        def copy(data):
+            request = request_factory.post("/", data)
+            request.user = user
+            response = copy_translation_stream_field(request, page.id)
+            self.assertEqual(response.status_code, 200)
+            return json.loads(response.content)
+
+        # The stored value is copied when no origin inputs are posted
+        # The block definition comes along, to rebuild the field in any Wagtail
+        # version from
+        data = copy({"origin_field_name": "body_en", "target_field_name": "body_de"})
+        self.assertEqual(data["block"]["_type"], "wagtail.blocks.StreamBlock")
+        self.assertEqual([block["value"] for block in data["value"]], ["Hello"])
+
+        # Posted origin inputs take precedence over the stored value
+        inputs = [
+            {"name": "body_en-count", "value": "1"},
+            {"name": "body_en-0-type", "value": "text"},
+            {"name": "body_en-0-value", "value": "Edited"},
+            {"name": "body_en-0-deleted", "value": ""},
+            {"name": "body_en-0-order", "value": "0"},
+            {"name": "body_en-0-id", "value": ""},
+        ]
+        data = copy(
+            {
+                "origin_field_name": "body_en",
+                "target_field_name": "body_de",
+                "serializedOriginField": json.dumps(inputs),
+            }
+        )
+        self.assertEqual([block["value"] for block in data["value"]], ["Edited"])
+
+        request = request_factory.post(
+            "/", {"origin_field_name": "title_en", "target_field_name": "body_de"}
+        )
+        request.user = user
+        response = copy_translation_stream_field(request, page.id)
+        self.assertEqual(response.status_code, 400)
+
+    def test_copy_translation_stream_fields(self):
+        from django.contrib.auth import get_user_model
+
+        from wagtail_modeltranslation.wagtail_hooks import (
+            copy_translation_stream_fields,
+        )
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root batch copy", "slug_de": "root-batch-copy"},
+            "children": {
+                "child": {
+                    "model": models.StreamFieldPanelPage,
+                    "kwargs": {
+                        "title_de": "child batch copy",
+                        "slug_de": "child-batch-copy",
+                        "body_de": '[{"value": "Hallo", "type": "text"}]',
+                        "body_en": '[{"value": "Hello", "type": "text"}]',
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        page = site_pages["children"]["child"]["instance"]
+        user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        request_factory = RequestFactory()
+
+        def copy(data):
+            request = request_factory.post("/", data)
+            request.user = user
+            response = copy_translation_stream_fields(request, page.id)
+            self.assertEqual(response.status_code, 200)
+            return json.loads(response.content)
+
+        # Every translated StreamField is copied into every other language,
+        # loading the page and reading the stored values once
+        copy({"origin_language": "de"})
+        with self.assertNumQueries(2):
+            data = copy({"origin_language": "de"})
+        self.assertEqual(list(data), ["body_de"])
+        self.assertEqual(data["body_de"]["targets"], ["body_en"])
+        self.assertEqual(
+            data["body_de"]["block"]["_type"], "wagtail.blocks.StreamBlock"
+        )
+        self.assertEqual(
+            [block["value"] for block in data["body_de"]["value"]], ["Hallo"]
+        )
+
+        inputs = {
+            "body_en": [
+                {"name": "body_en-count", "value": "1"},
+                {"name": "body_en-0-type", "value": "text"},
+                {"name": "body_en-0-value", "value": "Edited"},
+                {"name": "body_en-0-deleted", "value": ""},
+                {"name": "body_en-0-order", "value": "0"},
+                {"name": "body_en-0-id", "value": ""},
+            ]
+        }
+        data = copy(
+            {
+                "origin_language": "en",
+                "target_languages": ["de"],
+                "field_names": ["body"],
+                "serializedOriginFields": json.dumps(inputs),
+            }
+        )
+        self.assertEqual(data["body_en"]["targets"], ["body_de"])
+        self.assertEqual(
+            [block["value"] for block in data["body_en"]["value"]], ["Edited"]
+        )
+
+        request = request_factory.post(
+            "/", {"origin_language": "en", "target_languages": ["fr"]}
+        )
+        request.user = user
+        response = copy_translation_stream_fields(request, page.id)
+        self.assertEqual(response.status_code, 400)
+
+    def test_copy_stream_data_prefix_patching(self):
+        from wagtail_modeltranslation.wagtail_hooks import _get_stream_data
+
+        inputs = [
+            {"name": "body_en-count", "value": "1"},
+            {"name": "body_en-0-value", "value": "body_en"},
+            {"name": "body_en-0-tags", "value": "a"},
+            {"name": "body_en-0-tags", "value": "b"},
+            {"name": "body_english-0-value", "value": "other field"},
+        ]
+        data = _get_stream_data(inputs, "body_en", "body_de")
+
+        # Only the names starting with the origin prefix are renamed, values
+        # are kept as they are
+        self.assertEqual(
+            sorted(data),
+            [
+                "body_de-0-tags",
+                "body_de-0-value",
+                "body_de-count",
+                "body_english-0-value",
+            ],
+        )
+        self.assertEqual(data["body_de-0-value"], "body_en")
+        self.assertEqual(data.getlist("body_de-0-tags"), ["a", "b"])
+
+    def test_machine_translate_command(self):
+        """
+        Assert machine_translate fills in the empty translation fields with
+        the provider's translations, in the pages and their latest revision
+        """
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root mt", "slug_de": "root-mt"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {
+                        "title_de": "Seite",
+                        "title_en": "Page",
+                        "slug_de": "seite",
+                        "seo_title_de": "Seite SEO",
+                    },
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        child = site_pages["children"]["child"]["instance"]
+        snippet = models.FieldPanelSnippet.objects.create(name_de="Ding")
+
+        out = StringIO()
+        call_command(
+            "machine_translate",
+            provider="wagtail_modeltranslation.machine_translation.DummyTranslationProvider",
+            batch_size=1,
+            workers=2,
+            stdout=out,
+        )
+
+        child = Page.objects.rewrite(False).get(id=child.id)
+        self.assertEqual(child.title_en, "Page")
+        self.assertEqual(child.seo_title_en, "[en] Seite SEO")
+        self.assertEqual(child.slug_en, None)
+        self.assertEqual(
+            child.get_latest_revision().content["seo_title_en"], "[en] Seite SEO"
+        )
+        snippet.refresh_from_db()
+        self.assertEqual(snippet.name_en, "[en] Ding")
+        self.assertIn(
+            "Translated 1 values of field 'name' of model 'tests.FieldPanelSnippet' into en",
+            out.getvalue(),
+        )
+
+        # The fields inherited from Page are translated for the app's pages
+        Page.objects.filter(id=child.id).rewrite(False).update(
+            search_description_de="Beschreibung"
+        )
+        call_command(
+            "machine_translate",
+            "tests",
+            provider="wagtail_modeltranslation.machine_translation.DummyTranslationProvider",
+            stdout=StringIO(),
+        )
+        child = Page.objects.rewrite(False).get(id=child.id)
+        self.assertEqual(child.search_description_en, "[en] Beschreibung")
+
+        with self.assertRaisesMessage(CommandError, "No machine translation provider"):
+            call_command("machine_translate", stdout=StringIO())
+
+    def test_translation_report_command(self):
+        """
+        Assert translation_report counts the missing translations per field
+        and language, and lists the rows missing them with --gaps
+        """
+        from django.contrib.auth import get_user_model
+
+        from wagtail_modeltranslation.wagtail_hooks import translation_report
+
+        site_pages = {
+            "model": models.TestRootPage,
+            "kwargs": {"title_de": "root report", "slug_de": "root-report"},
+            "children": {
+                "child": {
+                    "model": models.TestSlugPage1,
+                    "kwargs": {"title_de": "Seite", "slug_de": "seite"},
+                },
+            },
+        }
+        page_factory.create_page_tree(site_pages)
+        child = site_pages["children"]["child"]["instance"]
+
+        out = StringIO()
+        call_command("translation_report", "wagtailcore", "page", stdout=out)
+        rows = out.getvalue().splitlines()
+        self.assertEqual(rows[0], "model,field,language,total,missing")
+        total = Page.objects.count()
+        self.assertIn("wagtailcore.Page,title,de,%s,0" % total, rows)
+        self.assertIn(
+            "wagtailcore.Page,title,en,%s,%s"
+            % (total, Page.objects.filter(title_en__isnull=True).count()),
+            rows,
+        )
+
+        out = StringIO()
+        call_command(
+            "translation_report",
+            "wagtailcore",
+            "page",
+            language=["en"],
+            gaps=True,
+            stdout=out,
+        )
+        rows = out.getvalue().splitlines()
+        self.assertEqual(rows[0], "model,id,language,missing fields")
+        self.assertIn(
+            "wagtailcore.Page,%s,en,search_description seo_title slug title" % child.id,
+            rows[1:],
+        )
+        self.assertNotIn(",de,", out.getvalue())
+
+        # The fields inherited from Page are reported with the app's pages, and
+        # empty streams are missing
+        stream_page = models.StreamFieldPanelPage(
+            title_de="Stream", slug_de="stream", body_de=[("text", "de")]
+        )
+        site_pages["instance"].add_child(instance=stream_page)
+        out = StringIO()
+        call_command("translation_report", "tests", stdout=out)
+        rows = out.getvalue().splitlines()
+        self.assertIn("tests.TestSlugPage1,title,en,1,1", rows)
+        self.assertIn("tests.StreamFieldPanelPage,body,de,1,0", rows)
+        self.assertIn("tests.StreamFieldPanelPage,body,en,1,1", rows)
+
+        # The admin report streams the same rows to superusers only
+        request = request_factory.get("/", {"export": "gaps"})
+        request.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        response = translation_report(request)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        content = b"".join(response.streaming_content).decode()
+        self.assertIn("wagtailcore.Page,%s,en," % child.id, content)
+        request.user = get_user_model().objects.create_user("editor")
+        with self.assertRaises(PermissionDenied):
+            translation_report(request)
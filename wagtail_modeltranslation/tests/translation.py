@@ -8,11 +8,13 @@ from wagtail_modeltranslation.tests.models import (
     FieldRowPanelSnippet,
     ImageChooserPanelPage,
     ImageChooserPanelSnippet,
+    InlinePanelNoPanelsPage,
     InlinePanelPage,
     InlinePanelSnippet,
     MultiFieldPanelPage,
     MultiFieldPanelSnippet,
     PageInlineModel,
+    PageInlineModelNoPanels,
     PatchTestPage,
     PatchTestSnippet,
     PatchTestSnippetNoPanels,
@@ -141,6 +143,16 @@ class InlinePanelModelTranslationOptions(TranslationOptions):
 translator.register(InlinePanelSnippet, InlinePanelModelTranslationOptions)
 
 
+@register(PageInlineModelNoPanels)
+class PageInlineModelNoPanelsTranslationOptions(TranslationOptions):
+    fields = ("name",)
+
+
+@register(InlinePanelNoPanelsPage)
+class InlinePanelNoPanelsPageTranslationOptions(TranslationOptions):
+    fields = ()
+
+
 @register(RoutablePageTest)
 class RoutablePageTestTranslationOptions(TranslationOptions):
     fields = ()
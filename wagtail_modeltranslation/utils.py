@@ -1,5 +1,13 @@
 import inspect
 
+from django.db.models import F, Q, TextField
+from django.db.models.functions import Cast
+from django.db.models.lookups import In
+from wagtail.fields import StreamField
+
+# Raw values of an empty stream as stored in the column of a StreamField
+EMPTY_STREAM_JSON = frozenset(["", "[]", "null"])
+
 
 def compare_class_tree_depth(model_class):
     """
@@ -19,3 +27,16 @@ def import_from_string(name):
     for comp in components[1:]:
         mod = getattr(mod, comp)
     return mod
+
+
+def empty_value_q(field, field_name):
+    """
+    Returns a filter matching the empty values of ``field`` stored in the
+    column of ``field_name``, one of its translation fields.
+    """
+    empty = Q(**{field_name + "__isnull": True})
+    if isinstance(field, StreamField):
+        empty |= Q(In(Cast(F(field_name), TextField()), sorted(EMPTY_STREAM_JSON)))
+    elif field.empty_strings_allowed:
+        empty |= Q(**{field_name: ""})
+    return empty
@@ -1,26 +1,47 @@
+import csv
 import json
+import itertools
+import re
+from collections import defaultdict
 
 from django.conf import settings
-from django.urls import re_path
-from django.core.exceptions import PermissionDenied
-from django.http import HttpResponse, QueryDict
-from django.shortcuts import redirect, render
+from django.urls import re_path, reverse
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.templatetags.static import static
-from django.utils.html import escape, format_html, format_html_join
+from django.utils.datastructures import MultiValueDict
+from django.utils.html import format_html, format_html_join
 from django.utils.translation import gettext as _
 from django.views.decorators.csrf import csrf_exempt
-from six import iteritems
 
+from modeltranslation.translator import NotRegistered, translator
 from modeltranslation.utils import build_localized_fieldname
 from modeltranslation import settings as mt_settings
 from wagtail_modeltranslation import settings as wmt_settings
 
-from .patch_wagtailadmin_forms import PatchedCopyForm
+from .patch_wagtailadmin_forms import (
+    LOCALE_PICKER_COOKIE,
+    PatchedCopyForm,
+    restrict_form_languages,
+)
+from .reports import (
+    COMPLETENESS_HEADER,
+    GAPS_HEADER,
+    Echo,
+    get_completeness_rows,
+    get_gap_rows,
+    get_report_models,
+)
+from .rich_text import LocalizedPageLinkHandler
 
 from wagtail import hooks, VERSION as _WAGTAIL_VERSION
+from wagtail.blocks import BlockWidget
+from wagtail.fields import StreamField
 from wagtail.models import Page
-from wagtail.rich_text.pages import PageLinkHandler
 from wagtail.admin import messages
+from wagtail.admin.menu import AdminOnlyMenuItem
 
 from wagtail.admin.views.pages.utils import get_valid_next_url_from_request
 
@@ -31,7 +52,18 @@ else:
     _HOOK_INSERT_CSS = "insert_editor_css"
 
 
-@hooks.register("insert_editor_js")
+def register_admin_hook(hook_name, fn=None, order=0):
+    """
+    Same as ``hooks.register``, except the hook is left unregistered when
+    WAGTAILMODELTRANSLATION_PATCH_ADMIN is disabled.
+    """
+    if wmt_settings.PATCH_ADMIN:
+        return hooks.register(hook_name, fn, order)
+    if fn is None:
+        return lambda fn: fn
+
+
+@register_admin_hook("insert_editor_js")
 def translation_settings():
     lang_codes = []
     for lang in settings.LANGUAGES:
@@ -52,7 +84,9 @@ def translation_settings():
             viewEditString: '{view_edit_string}',
             translate_slugs: {translate_slugs},
             locale_picker_default: [{locale_picker_default}],
-            locale_picker_restore: {locale_picker_restore}
+            locale_picker_restore: {locale_picker_restore},
+            locale_picker_render_selected: {locale_picker_render_selected},
+            locale_picker_cookie: '{locale_picker_cookie}'
         }};
     </script>
     """.format(
@@ -62,6 +96,10 @@ def translation_settings():
         translate_slugs="true" if wmt_settings.TRANSLATE_SLUGS else "false",
         locale_picker_default=locale_picker_default,
         locale_picker_restore="true" if wmt_settings.LOCALE_PICKER_RESTORE else "false",
+        locale_picker_render_selected=(
+            "true" if wmt_settings.LOCALE_PICKER_RENDER_SELECTED else "false"
+        ),
+        locale_picker_cookie=LOCALE_PICKER_COOKIE,
     )
 
     return js_languages
@@ -69,7 +107,7 @@ def translation_settings():
 
 if wmt_settings.LOCALE_PICKER:
 
-    @hooks.register("insert_editor_js")
+    @register_admin_hook("insert_editor_js")
     def language_toggles():
         """
         On any admin page, try to load the l10n code that aggregates
@@ -96,9 +134,39 @@ if wmt_settings.LOCALE_PICKER:
         return js_includes + css_includes
 
 
+if wmt_settings.SAVE_CHANGED_LANGUAGES:
+
+    @register_admin_hook("insert_editor_js")
+    def changed_languages():
+        """
+        Tells the server which languages were changed when a page form is
+        submitted, so it only cleans and saves those.
+        """
+        return format_html(
+            '<script src="{}"></script>',
+            static("wagtail_modeltranslation/js/changed_languages.js"),
+        )
+
+
 ###############################################################################
 # Copy StreamFields content
 ###############################################################################
+def _get_stream_data(inputs, origin_prefix=None, target_prefix=None):
+    """
+    Returns the serialized form ``inputs`` as form data, renaming the inputs
+    of the ``origin_prefix`` field to ``target_prefix`` if given.
+    """
+    data = defaultdict(list)
+    if origin_prefix is None:
+        for item in inputs:
+            data[item["name"]].append(item["value"])
+    else:
+        sub = re.compile(r"^%s(?=-|$)" % re.escape(origin_prefix)).sub
+        for item in inputs:
+            data[sub(target_prefix, item["name"], 1)].append(item["value"])
+    return MultiValueDict(data)
+
+
 @csrf_exempt
 def return_translation_target_field_rendered_html(request, page_id):
     """
@@ -114,27 +182,13 @@ def return_translation_target_field_rendered_html(request, page_id):
         origin_field_serialized = json.loads(request.POST.get('serializedOriginField'))
 
         # Patch field prefixes from origin field to target field
-        target_field_patched = []
-        for item in origin_field_serialized:
-            patched_item = {"name": None, "value": None}
-            for att in iteritems(item):
-                target_value = att[1]
-                if att[0] == "name":
-                    target_value = att[1].replace(origin_field_name, target_field_name)
-                    patched_item["name"] = target_value
-                else:
-                    patched_item["value"] = att[1]
-
-            target_field_patched.append(patched_item)
-
-        # convert to QueryDict
-        q_data = QueryDict("", mutable=True)
-        for item in target_field_patched:
-            q_data.update({item["name"]: item["value"]})
+        q_data = _get_stream_data(
+            origin_field_serialized, origin_field_name, target_field_name
+        )
 
         # get render html
 
-        target_field = page.specific._meta.get_field(target_field_name)
+        target_field = page.specific_class._meta.get_field(target_field_name)
         value_data = target_field.stream_block.value_from_datadict(
             q_data, {}, target_field_name
         )
@@ -148,7 +202,265 @@ def return_translation_target_field_rendered_html(request, page_id):
     )
 
 
-@hooks.register("register_admin_urls")
+def _get_stream_fields(model, field_names):
+    """
+    Returns the StreamFields of ``model`` named ``field_names``, or None if any
+    of them isn't a StreamField.
+    """
+    fields = []
+    for field_name in field_names:
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            return None
+        if not isinstance(field, StreamField):
+            return None
+        fields.append(field)
+    return fields
+
+
+def _get_stored_stream_values(model, page_id, fields):
+    """
+    Returns the values of ``fields`` stored for the page ``page_id``, reading
+    only their columns.
+    """
+    if not fields:
+        return {}
+
+    row = (
+        model._default_manager.filter(pk=page_id)
+        .values_list(*[field.name for field in fields])
+        .first()
+    )
+    values = {}
+    for field, value in zip(fields, row or [None] * len(fields)):
+        if value is None:
+            value = field.stream_block.to_python([])
+        values[field.name] = value
+    return values
+
+
+def _get_stream_value_from_inputs(field, inputs):
+    """
+    Returns the value of ``field`` posted in the serialized form ``inputs``.
+    """
+    return field.stream_block.value_from_datadict(
+        _get_stream_data(inputs), {}, field.name
+    )
+
+
+def _get_stream_value_json(field, value):
+    return json.dumps(field.stream_block.get_form_state(value), cls=DjangoJSONEncoder)
+
+
+def _get_stream_block_json(field):
+    return BlockWidget(field.stream_block).block_json
+
+
+@csrf_exempt
+def copy_translation_stream_field(request, page_id):
+    """
+    Ajax view returning the block definition of a StreamField and the form
+    state of its value copied into another language, for the browser to
+    rebuild the target StreamField with instead of replacing it by rendered
+    HTML. The origin value is read from the posted origin field inputs, or
+    from the database when none are posted.
+    """
+    if request.method != "POST":
+        return HttpResponseBadRequest()
+
+    page = get_object_or_404(Page, pk=page_id)
+    if not page.permissions_for_user(request.user).can_edit():
+        raise PermissionDenied
+
+    model = page.specific_class
+    origin_field_name = request.POST.get("origin_field_name")
+    target_field_name = request.POST.get("target_field_name")
+    fields = _get_stream_fields(model, [origin_field_name, target_field_name])
+    if fields is None:
+        return HttpResponseBadRequest()
+    origin_field, target_field = fields
+
+    if "serializedOriginField" in request.POST:
+        value = _get_stream_value_from_inputs(
+            origin_field, json.loads(request.POST["serializedOriginField"])
+        )
+    else:
+        value = _get_stored_stream_values(model, page_id, [origin_field])[
+            origin_field_name
+        ]
+
+    return HttpResponse(
+        '{"block": %s, "value": %s}'
+        % (
+            _get_stream_block_json(target_field),
+            _get_stream_value_json(origin_field, value),
+        ),
+        content_type="application/json",
+    )
+
+
+@csrf_exempt
+def copy_translation_stream_fields(request, page_id):
+    """
+    Ajax view copying the StreamFields of one language into many others with a
+    single page load. Copies the ``field_names`` posted, or every translated
+    StreamField of the page, from ``origin_language`` into the
+    ``target_languages``, or every other language. Returns, by origin field
+    name, the block definition and the form state of its value, once, along
+    with the names of the target fields to copy it into. The translation
+    fields of a StreamField share its block definition.
+
+    The origin values are read from ``serializedOriginFields``, a JSON object
+    of the serialized inputs per origin field name, or from the database for
+    the origin fields it doesn't hold.
+    """
+    if request.method != "POST":
+        return HttpResponseBadRequest()
+
+    page = get_object_or_404(Page, pk=page_id)
+    if not page.permissions_for_user(request.user).can_edit():
+        raise PermissionDenied
+
+    model = page.specific_class
+    origin_language = request.POST.get("origin_language")
+    target_languages = request.POST.getlist("target_languages") or [
+        language
+        for language in mt_settings.AVAILABLE_LANGUAGES
+        if language != origin_language
+    ]
+    languages = [origin_language] + target_languages
+    if not set(languages).issubset(mt_settings.AVAILABLE_LANGUAGES):
+        return HttpResponseBadRequest()
+
+    field_names = request.POST.getlist("field_names")
+    if not field_names:
+        try:
+            translated_fields = translator.get_options_for_model(model).all_fields
+        except NotRegistered:
+            return HttpResponseBadRequest()
+        field_names = [
+            field_name
+            for field_name in translated_fields
+            if isinstance(model._meta.get_field(field_name), StreamField)
+        ]
+
+    origin_fields = _get_stream_fields(
+        model,
+        [build_localized_fieldname(name, origin_language) for name in field_names],
+    )
+    target_fields = _get_stream_fields(
+        model,
+        [
+            build_localized_fieldname(name, language)
+            for name in field_names
+            for language in target_languages
+        ],
+    )
+    if origin_fields is None or target_fields is None:
+        return HttpResponseBadRequest()
+
+    posted_inputs = json.loads(request.POST.get("serializedOriginFields", "{}"))
+    values = _get_stored_stream_values(
+        model,
+        page_id,
+        [field for field in origin_fields if field.name not in posted_inputs],
+    )
+    for field in origin_fields:
+        if field.name in posted_inputs:
+            values[field.name] = _get_stream_value_from_inputs(
+                field, posted_inputs[field.name]
+            )
+
+    copies = []
+    target_fields = iter(target_fields)
+    for origin_field in origin_fields:
+        target_names = [next(target_fields).name for language in target_languages]
+        copies.append(
+            '%s: {"block": %s, "value": %s, "targets": %s}'
+            % (
+                json.dumps(origin_field.name),
+                _get_stream_block_json(origin_field),
+                _get_stream_value_json(origin_field, values[origin_field.name]),
+                json.dumps(target_names),
+            )
+        )
+
+    return HttpResponse("{%s}" % ", ".join(copies), content_type="application/json")
+
+
+def return_locale_panels(request, page_id):
+    """
+    Returns the panels of the translation fields of a language the page
+    editor didn't render, along with the names of each field in every
+    language, for the locale picker to insert them next to their siblings.
+    """
+    language = request.GET.get("language")
+    if language not in mt_settings.AVAILABLE_LANGUAGES:
+        return HttpResponseBadRequest()
+
+    real_page = get_object_or_404(Page, id=page_id).specific
+    if not real_page.permissions_for_user(request.user).can_edit():
+        raise PermissionDenied
+    page = real_page.get_latest_revision_as_object()
+
+    edit_handler = page.get_edit_handler()
+    form = edit_handler.get_form_class()(
+        instance=page, parent_page=real_page.get_parent(), for_user=request.user
+    )
+    restrict_form_languages(form, [language], keep_untranslated=False)
+    bound_panel = edit_handler.get_bound_panel(
+        instance=page, request=request, form=form
+    )
+
+    translated_fields = {}
+    opts = translator.get_options_for_model(page.__class__)
+    for translation_fields in opts.all_fields.values():
+        localized_names = {field.language: field.name for field in translation_fields}
+        if localized_names.get(language) in form.fields:
+            translated_fields[localized_names[language]] = localized_names
+    return HttpResponse(
+        json.dumps(
+            {"fields": translated_fields, "html": bound_panel.render_form_content()}
+        ),
+        content_type="application/json",
+    )
+
+
+def translation_report(request):
+    """
+    Lists how many rows of each translated model miss each translated field
+    per language, or streams it as CSV with ``?export=completeness``, or the
+    rows missing them with ``?export=gaps``.
+    """
+    if not request.user.is_superuser:
+        raise PermissionDenied
+
+    report_models = get_report_models()
+    export = request.GET.get("export")
+    if export not in ("completeness", "gaps"):
+        return render(
+            request,
+            "modeltranslation_report.html",
+            {"rows": list(get_completeness_rows(report_models))},
+        )
+
+    if export == "gaps":
+        header, rows = GAPS_HEADER, get_gap_rows(report_models)
+    else:
+        header, rows = COMPLETENESS_HEADER, get_completeness_rows(report_models)
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in itertools.chain([header], rows)),
+        content_type="text/csv",
+    )
+    response["Content-Disposition"] = (
+        'attachment; filename="translation-%s.csv"' % export
+    )
+    return response
+
+
+@register_admin_hook("register_admin_urls")
 def copy_streamfields_content():
     return [
         re_path(
@@ -156,10 +468,40 @@ def copy_streamfields_content():
             return_translation_target_field_rendered_html,
             name="",
         ),
+        re_path(
+            r"pages/(?P<page_id>\d+)/edit/copy_translation_stream_field/$",
+            copy_translation_stream_field,
+            name="wagtail_modeltranslation_copy_stream_field",
+        ),
+        re_path(
+            r"pages/(?P<page_id>\d+)/edit/copy_translation_stream_fields/$",
+            copy_translation_stream_fields,
+            name="wagtail_modeltranslation_copy_stream_fields",
+        ),
+        re_path(
+            r"pages/(?P<page_id>\d+)/edit/locale_panels/$",
+            return_locale_panels,
+            name="wagtail_modeltranslation_locale_panels",
+        ),
+        re_path(
+            r"translation_report/$",
+            translation_report,
+            name="wagtail_modeltranslation_translation_report",
+        ),
     ]
 
 
-@hooks.register("insert_editor_js")
+@register_admin_hook("register_reports_menu_item")
+def register_translation_report_menu_item():
+    return AdminOnlyMenuItem(
+        _("Translations"),
+        reverse("wagtail_modeltranslation_translation_report"),
+        icon_name="site",
+        order=1000,
+    )
+
+
+@register_admin_hook("insert_editor_js")
 def streamfields_translation_copy():
     """
     Includes script in editor html file that creates
@@ -181,13 +523,13 @@ def streamfields_translation_copy():
     return js_includes
 
 
-@hooks.register(_HOOK_INSERT_CSS)
+@register_admin_hook(_HOOK_INSERT_CSS)
 def modeltranslation_page_editor_css():
     filename = "wagtail_modeltranslation/css/page_editor_modeltranslation.css"
     return format_html('<link rel="stylesheet" href="{}">', static(filename))
 
 
-@hooks.register(_HOOK_INSERT_CSS)
+@register_admin_hook(_HOOK_INSERT_CSS)
 def modeltranslation_page_editor_titles_css():
     """
     Patch admin styles, in particular page title headings missing in Wagtail 4
@@ -199,30 +541,16 @@ def modeltranslation_page_editor_titles_css():
 
 @hooks.register("register_rich_text_link_handler")
 def register_localized_page_link_handler():
-    class LocalizedPageLinkHandler(PageLinkHandler):
-        @staticmethod
-        def expand_db_attributes(attrs, for_editor):
-            # This method is a copy of the original one
-            # the only difference is the .specific on the escape method
-            try:
-                page = Page.objects.get(id=attrs["id"])
-
-                if for_editor:
-                    editor_attrs = 'data-linktype="page" data-id="%d" ' % page.id
-                    parent_page = page.get_parent()
-                    if parent_page:
-                        editor_attrs += 'data-parent-id="%d" ' % parent_page.id
-                else:
-                    editor_attrs = ""
+    return ("page", LocalizedPageLinkHandler)
 
-                return '<a %shref="%s">' % (editor_attrs, escape(page.specific.url))
-            except Page.DoesNotExist:
-                return "<a>"
 
-    return ("page", LocalizedPageLinkHandler)
+@hooks.register("register_rich_text_features", order=1)
+def register_localized_page_link_type(features):
+    # Replace Wagtail's own page link handler, registered by the core features hook
+    features.register_link_type(LocalizedPageLinkHandler)
 
 
-@hooks.register("before_copy_page")
+@register_admin_hook("before_copy_page")
 def before_copy_page(request, page):
     parent_page = page.get_parent()
     can_publish = parent_page.permissions_for_user(request.user).can_publish_subpage()